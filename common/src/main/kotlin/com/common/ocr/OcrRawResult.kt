@@ -18,7 +18,13 @@ data class OcrRawResult(
         val confidence: Double = 0.0,
 
         /** 사용된 OCR 엔진 이름 */
-        val engine: String = "unknown"
+        val engine: String = "unknown",
+
+        /** OCR 서버의 규칙 기반 필드 추출 결과 (지원하지 않는 엔진은 null) */
+        val extractedFields: OcrParsedData? = null,
+
+        /** 필수 필드가 모두 검증을 통과했는지 여부 (true 이면 LLM 파싱 생략 가능) */
+        val fieldsComplete: Boolean = false
 ) {
     companion object {
         fun empty() = OcrRawResult(fullText = "", lines = emptyList(), success = true)
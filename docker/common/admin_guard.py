@@ -0,0 +1,27 @@
+"""
+관리/디버그 엔드포인트 보호 공통 모듈
+ADMIN_TOKEN 환경변수가 설정된 경우에만 활성화되며, 요청은 X-Admin-Token 헤더로 같은 토큰을 전달해야 함
+"""
+
+import functools
+import hmac
+import os
+
+from flask import jsonify, request
+
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+
+def require_admin_token(view):
+    """ADMIN_TOKEN 미설정 시 404, 토큰 불일치 시 403"""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({"success": False, "error": "Admin endpoints are disabled (ADMIN_TOKEN not set)"}), 404
+        token = request.headers.get("X-Admin-Token", "")
+        if not hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+            return jsonify({"success": False, "error": "Invalid admin token"}), 403
+        return view(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,111 @@
+"""
+규칙 기반 필드 추출 벤치마크
+샘플 세트에서 LLM 파싱을 생략할 수 있는 비율(skip rate)과 추출 시간을 측정
+
+1. 텍스트 샘플 (기본): Y 좌표로 병합된 OCR 라인 파일 (*.txt, 한 줄에 "텍스트<TAB>신뢰도", 신뢰도 생략 시 0.95)
+   서버와 같이 merge_spaced_korean_words 를 적용한 뒤 추출 (서버가 실제로 넘기는 입력과 동일)
+    python bench_field_extraction.py samples/business_license
+2. 이미지 샘플: 실행 중인 RapidOCR 서버로 이미지를 보내 응답의 extraction 결과 집계
+    python bench_field_extraction.py /path/to/images --server http://localhost:9003
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+import urllib.request
+import uuid
+
+from field_extraction import extract_business_license_fields, merge_spaced_korean_words
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+DEFAULT_SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'samples', 'business_license')
+
+
+def load_lines(path):
+    lines = []
+    with open(path, encoding='utf-8') as f:
+        for raw in f:
+            raw = raw.rstrip('\n')
+            if not raw.strip():
+                continue
+            text, _, confidence = raw.partition('\t')
+            lines.append({
+                "text": merge_spaced_korean_words(text),
+                "confidence": float(confidence) if confidence else 0.95,
+            })
+    return lines
+
+
+def extract_from_text(path, repeat):
+    lines = load_lines(path)
+    timings = []
+    extraction = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extraction = extract_business_license_fields(lines)
+        timings.append((time.perf_counter() - start) * 1000)
+    return extraction, statistics.median(timings)
+
+
+def extract_from_server(path, server):
+    """multipart/form-data 로 이미지를 전송하고 extraction 필드만 요청"""
+    boundary = uuid.uuid4().hex
+    with open(path, 'rb') as f:
+        image_bytes = f.read()
+    body = (
+        f"--{boundary}\r\n"
+        f"Content-Disposition: form-data; name=\"image_file\"; filename=\"{os.path.basename(path)}\"\r\n"
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode('utf-8') + image_bytes + f"\r\n--{boundary}--\r\n".encode('utf-8')
+
+    request = urllib.request.Request(
+        f"{server.rstrip('/')}/ocr?fields=extraction",
+        data=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+    )
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=120) as response:
+        payload = json.loads(response.read())
+    elapsed = (time.perf_counter() - start) * 1000
+    return payload.get("extraction") or {"complete": False, "missing": ["(no extraction)"]}, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Field extraction skip-rate benchmark")
+    parser.add_argument('samples', nargs='?', default=DEFAULT_SAMPLES, help="샘플 디렉토리")
+    parser.add_argument('--server', help="RapidOCR 서버 URL (지정 시 이미지 샘플 사용)")
+    parser.add_argument('--repeat', type=int, default=200, help="텍스트 샘플 반복 측정 횟수")
+    args = parser.parse_args()
+
+    extensions = IMAGE_EXTENSIONS if args.server else ('.txt',)
+    files = sorted(
+        name for name in os.listdir(args.samples) if name.lower().endswith(extensions)
+    )
+    if not files:
+        print(f"No samples found in {args.samples}")
+        return
+
+    skipped = 0
+    timings = []
+    print(f"{'sample':<28} {'skip LLM':<9} {'time(ms)':>9}  missing")
+    for name in files:
+        path = os.path.join(args.samples, name)
+        if args.server:
+            extraction, elapsed = extract_from_server(path, args.server)
+        else:
+            extraction, elapsed = extract_from_text(path, args.repeat)
+        skipped += 1 if extraction["complete"] else 0
+        timings.append(elapsed)
+        print(f"{name:<28} {'yes' if extraction['complete'] else 'no':<9} {elapsed:>9.3f}  "
+              f"{','.join(extraction['missing'])}")
+
+    print("-" * 60)
+    print(f"Samples: {len(files)}")
+    print(f"Skip rate: {skipped}/{len(files)} ({skipped / len(files) * 100:.1f}%)")
+    print(f"Median time: {statistics.median(timings):.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
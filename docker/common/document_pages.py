@@ -0,0 +1,339 @@
+"""
+다중 페이지 문서(PDF, TIFF) 입력 공통 모듈
+
+- 페이지를 하나씩 지연 래스터화하는 제너레이터 (메모리에는 한 페이지만 유지)
+- PDF 는 검출기 입력 크기에 맞춘 DPI 로 렌더링 (긴 변 ≈ PAGE_TARGET_SIDE 픽셀)
+- 페이지별 OCR 결과를 NDJSON 으로 스트리밍하고, 사업자등록번호가 검증된 페이지를 찾으면 조기 종료
+- 공유 메모리로 전달된 문서(memoryview)는 PDF, TIFF 모두 복사 없이 매핑된 버퍼에서 직접 읽음
+
+PDF 렌더링에는 pypdfium2, TIFF 에는 Pillow 필요
+"""
+
+import io
+import math
+import os
+import time
+
+from flask import Response, request, stream_with_context
+
+from field_extraction import extract_business_license_fields
+from ocr_response import encode_json, pack_boxes, select_fields, wants_boxes
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# 래스터화 목표 크기 (긴 변 픽셀) 및 DPI 범위
+PAGE_TARGET_SIDE = int(os.environ.get("PAGE_TARGET_SIDE", 2000))
+PAGE_MIN_DPI = float(os.environ.get("PAGE_MIN_DPI", 100))
+PAGE_MAX_DPI = float(os.environ.get("PAGE_MAX_DPI", 300))
+# 한 페이지 래스터의 최대 픽셀 수 (PAGE_MIN_DPI 보다 우선, 큰 페이지에서도 메모리 사용량 제한)
+PAGE_MAX_PIXELS = int(os.environ.get("PAGE_MAX_PIXELS", 16_000_000))
+
+# 한 문서에서 처리할 최대 페이지 수
+MAX_PAGES = int(os.environ.get("MAX_DOCUMENT_PAGES", 50))
+
+PDF_MAGIC = b'%PDF'
+TIFF_MAGICS = (b'II*\x00', b'MM\x00*')
+
+# 손상된 문서를 열거나 래스터화할 때 발생하는 예외
+# (pypdfium2.PdfiumError 는 RuntimeError, PIL.UnidentifiedImageError 는 OSError 하위 클래스)
+_RASTERIZE_ERRORS = (OSError, RuntimeError, ValueError, EOFError, MemoryError) + (
+    (Image.DecompressionBombError,) if Image is not None else ())
+
+
+class DocumentError(ValueError):
+    """문서를 열 수 없는 경우 (지원하지 않는 형식, 손상된 파일, 필요한 라이브러리 없음)"""
+
+
+def document_kind(data):
+    """'pdf', 'tiff' 또는 None (단일 이미지)"""
+    if data[:4] == PDF_MAGIC:
+        return 'pdf'
+    if data[:4] in TIFF_MAGICS:
+        return 'tiff'
+    return None
+
+
+def is_multipage_document(data):
+    return document_kind(data) is not None
+
+
+def choose_dpi(width_pt, height_pt):
+    """
+    페이지 크기(pt, 1/72 inch)에서 긴 변이 PAGE_TARGET_SIDE 픽셀이 되는 DPI
+    작은 글씨가 뭉개지지 않도록 PAGE_MIN_DPI 까지 올리되, 렌더링 결과가 PAGE_MAX_PIXELS 를 넘지 않는 범위에서만
+    (예: 200 inch 페이지에 100 DPI 를 적용하면 20000x20000 픽셀 → BGRA 1.6GB)
+    """
+    width_in = max(width_pt, 1.0) / 72.0
+    height_in = max(height_pt, 1.0) / 72.0
+    dpi = max(PAGE_MIN_DPI, min(PAGE_MAX_DPI, PAGE_TARGET_SIDE / max(width_in, height_in)))
+    return min(dpi, math.sqrt(PAGE_MAX_PIXELS / (width_in * height_in)))
+
+
+class _BufferReader(io.RawIOBase):
+    """공유 메모리 매핑(memoryview)을 복사 없이 읽는 파일 객체 (pypdfium2, Pillow 는 bytes 또는 스트림만 허용)"""
+
+    def __init__(self, view):
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def readinto(self, buffer):
+        target = memoryview(buffer).cast('B')
+        chunk = self._view[self._pos:self._pos + len(target)]
+        target[:len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+
+def _open_pdf(data):
+    return pdfium.PdfDocument(data if isinstance(data, bytes) else _BufferReader(data))
+
+
+def _open_tiff(data):
+    # io.BytesIO(memoryview) 는 매핑 전체를 복사하므로 memoryview 는 _BufferReader 로 감쌈
+    return Image.open(io.BytesIO(data) if isinstance(data, bytes) else _BufferReader(data))
+
+
+def _encode_png(image):
+    buffer = io.BytesIO()
+    # 속도 우선 (OCR 직전에 다시 디코딩되는 중간 결과)
+    image.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def _render_pdf_page(pdf, index):
+    page = pdf[index]
+    try:
+        width, height = page.get_size()
+        dpi = choose_dpi(width, height)
+        bitmap = page.render(scale=dpi / 72.0)
+        try:
+            image = bitmap.to_pil()
+            meta = {"dpi": round(dpi, 1), "width": image.width, "height": image.height}
+            return _encode_png(image), meta
+        finally:
+            bitmap.close()
+    finally:
+        page.close()
+
+
+def _iter_pdf_pages(data):
+    if pdfium is None:
+        raise DocumentError("PDF input requires pypdfium2")
+    pdf = _open_pdf(data)
+    try:
+        for index in range(len(pdf)):
+            try:
+                image_bytes, meta = _render_pdf_page(pdf, index)
+            except _RASTERIZE_ERRORS as e:
+                # 손상된 페이지는 건너뛰고 다음 페이지 계속
+                image_bytes, meta = None, {"error": f"Cannot rasterize page: {e}"}
+            yield index, image_bytes, meta
+    finally:
+        pdf.close()
+
+
+def _render_tiff_frame(tiff, index):
+    tiff.seek(index)
+    # 현재 프레임만 디코딩
+    frame = tiff.convert('RGB')
+    scale = PAGE_TARGET_SIDE / max(frame.size)
+    if scale < 1.0:
+        frame = frame.resize((int(frame.width * scale), int(frame.height * scale)))
+    # 해상도 태그가 없으면 Pillow 가 (1, 1) 을 돌려주므로 무시
+    dpi = tiff.info.get('dpi')
+    meta = {"dpi": round(float(dpi[0]), 1) if dpi and dpi[0] > 1 else None,
+            "width": frame.width, "height": frame.height}
+    return _encode_png(frame), meta
+
+
+def _iter_tiff_pages(data):
+    if Image is None:
+        raise DocumentError("TIFF input requires Pillow")
+    with _open_tiff(data) as tiff:
+        for index in range(getattr(tiff, 'n_frames', 1)):
+            try:
+                image_bytes, meta = _render_tiff_frame(tiff, index)
+            except _RASTERIZE_ERRORS as e:
+                # 손상된 프레임은 건너뛰고 다음 프레임 계속
+                image_bytes, meta = None, {"error": f"Cannot rasterize page: {e}"}
+            yield index, image_bytes, meta
+
+
+def page_count(data):
+    """전체 페이지 수 (래스터화 없이 계산, 열 수 없는 문서면 DocumentError)"""
+    try:
+        return _page_count(data)
+    except DocumentError:
+        raise
+    except _RASTERIZE_ERRORS as e:
+        raise DocumentError(f"Cannot open document: {e}")
+
+
+def _page_count(data):
+    kind = document_kind(data)
+    if kind == 'pdf':
+        if pdfium is None:
+            raise DocumentError("PDF input requires pypdfium2")
+        pdf = _open_pdf(data)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    if kind == 'tiff':
+        if Image is None:
+            raise DocumentError("TIFF input requires Pillow")
+        with _open_tiff(data) as tiff:
+            return getattr(tiff, 'n_frames', 1)
+    return 1
+
+
+def iter_pages(data):
+    """
+    (페이지 인덱스, PNG 바이트, 메타데이터) 제너레이터 (단일 이미지는 한 페이지로 취급)
+    래스터화에 실패한 페이지는 PNG 바이트가 None, 메타데이터에 error
+    """
+    kind = document_kind(data)
+    if kind == 'pdf':
+        return _iter_pdf_pages(data)
+    if kind == 'tiff':
+        return _iter_tiff_pages(data)
+    return iter([(0, data, {})])
+
+
+def contains_registration_data(payload):
+    """사업자등록번호(체크섬 검증)가 있는 페이지인지 확인"""
+    extraction = payload.get("extraction")
+    if extraction is None:
+        extraction = extract_business_license_fields(payload.get("lines") or [])
+    number = extraction["fields"].get("businessNumber")
+    return bool(number and number["valid"])
+
+
+def iter_page_results(data, process_fn, stop_when_found=True, max_pages=MAX_PAGES):
+    """
+    페이지별 OCR 결과 제너레이터
+
+    Args:
+        process_fn: 이미지 바이트 -> (응답 dict, 라인별 박스)
+    Yields:
+        (페이지 번호(1부터), 메타데이터, 응답 dict, 박스, 등록번호 발견 여부)
+        래스터화에 실패한 페이지는 {"success": False, "error": ...} 응답으로 전달
+    """
+    pages = iter_pages(data)
+    next_index = 0
+    while next_index < max_pages:
+        try:
+            index, image_bytes, meta = next(pages)
+        except StopIteration:
+            break
+        except _RASTERIZE_ERRORS as e:
+            # 문서 자체를 더 읽을 수 없음 → 실패한 페이지 하나를 전달하고 종료
+            yield next_index + 1, {}, {"success": False, "error": f"Cannot read document: {e}"}, None, False
+            break
+        next_index = index + 1
+
+        start = time.perf_counter()
+        if image_bytes is None:
+            payload, boxes = {"success": False, "error": meta.pop("error")}, None
+        else:
+            try:
+                payload, boxes = process_fn(image_bytes)
+            except Exception as e:
+                payload, boxes = {"success": False, "error": str(e)}, None
+        # 다음 페이지 래스터화 전에 현재 페이지 이미지 해제
+        del image_bytes
+        meta["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+        found = payload.get("success", False) and contains_registration_data(payload)
+        yield index + 1, meta, payload, boxes, found
+        if found and stop_when_found:
+            break
+
+
+def process_document(data, process_fn):
+    """
+    단일 응답용 문서 처리 (/ocr 에 PDF/TIFF 가 들어온 경우)
+    등록번호가 있는 첫 페이지, 없으면 라인이 가장 많은 페이지 결과 반환
+    """
+    best = None
+    total = page_count(data)
+    for page, meta, payload, boxes, found in iter_page_results(data, process_fn):
+        lines = len(payload.get("lines") or [])
+        if found or best is None or lines > best[0]:
+            best = (lines, page, payload, boxes)
+        if found:
+            break
+
+    if best is None:
+        return {"success": False, "error": "Document has no pages", "page_count": total}, None
+    _, page, payload, boxes = best
+    payload = dict(payload, page=page, page_count=total)
+    return payload, boxes
+
+
+def page_stream_response(data, process_fn):
+    """
+    페이지별 결과 NDJSON 스트리밍 응답
+    (열 수 없는 문서면 페이지 수 계산 단계에서 DocumentError - 스트리밍 시작 전에 발생.
+     스트리밍 중 실패한 페이지는 result.success=false 라인으로 보내고 마지막 done 라인은 항상 전송)
+
+    Query:
+    - stop_early: 등록번호 페이지를 찾으면 중단 (기본 1)
+    - max_pages: 최대 처리 페이지 수
+    """
+    stop_when_found = request.args.get('stop_early', '1').lower() not in ('0', 'false', 'no')
+    max_pages = min(int(request.args.get('max_pages', MAX_PAGES)), MAX_PAGES)
+    include_boxes = wants_boxes()
+    total = page_count(data)
+
+    def generate():
+        start = time.perf_counter()
+        processed = 0
+        failed = 0
+        found_page = None
+        for page, meta, payload, boxes, found in iter_page_results(
+                data, process_fn, stop_when_found, max_pages):
+            processed += 1
+            if not payload.get("success", False):
+                failed += 1
+            if found and found_page is None:
+                found_page = page
+            line = {"page": page, "page_count": total, "registration_found": found, **meta,
+                    "result": select_fields(payload)}
+            if include_boxes and boxes is not None:
+                line["boxes"] = pack_boxes(boxes, binary=False)
+            yield encode_json(line) + b"\n"
+
+        yield encode_json({
+            "done": True,
+            "page_count": total,
+            "pages_processed": processed,
+            "pages_failed": failed,
+            "found_page": found_page,
+            "stopped_early": found_page is not None and processed < min(total, max_pages),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }) + b"\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -0,0 +1,291 @@
+"""
+사업자등록증 규칙 기반 필드 추출 공통 모듈
+라벨(등록번호, 상호, 대표자 ...)을 기준으로 병합된 라인에서 값을 추출하고 필드별로 검증
+
+입력 라인은 RapidOCR 서버의 merge_lines_by_y_coordinate 결과로, merge_spaced_korean_words 가
+한글 사이 공백을 제거하므로 라벨이 값에 붙어 들어옴 (예: "성명:홍길동생년월일:1980년05월17일")
+→ 라벨 앞뒤 글자와 무관하게 라벨을 찾고, 검증을 통과하는 후보를 우선 사용
+
+- 사업자등록번호: 국세청 체크섬(마지막 자리) 검증
+- 법인등록번호: 체크섬(마지막 자리) 검증
+- 개업연월일: 실제 존재하는 날짜인지 검증 후 YYYY-MM-DD 로 정규화
+- 대표자/주소/상호: 형식 검증
+
+필드명은 Worker의 OcrParsedData 와 동일 (camelCase)
+필수 필드가 모두 검증을 통과하고 신뢰도가 임계값 이상이면 complete=True
+→ Worker가 LLM(Gemma3) 파싱을 생략할 수 있음
+"""
+
+import datetime
+import os
+import re
+import time
+
+# 필수 필드 신뢰도 임계값
+MIN_FIELD_CONFIDENCE = float(os.environ.get("FIELD_MIN_CONFIDENCE", 0.8))
+
+# LLM 생략 판단에 사용하는 필수 필드
+REQUIRED_FIELDS = ("businessNumber", "merchantName", "representativeName", "openingDate", "address")
+
+# 필드별 라벨 (앞쪽이 우선, 긴 라벨을 먼저 시도)
+FIELD_LABELS = {
+    "businessNumber": ["사업자등록번호", "등록번호"],
+    "corporateNumber": ["법인등록번호"],
+    "merchantName": ["법인명(단체명)", "법인명", "단체명", "상호"],
+    "representativeName": ["대표자", "성명"],
+    "openingDate": ["개업연월일", "개업년월일"],
+    "address": ["사업장소재지", "사업장주소"],
+    "headOfficeAddress": ["본점소재지"],
+    "businessType": ["업태"],
+    "businessItem": ["종목"],
+}
+
+# 값을 잘라내는 기준으로만 사용하는 라벨
+STOP_LABELS = [
+    "생년월일", "사업의종류", "발급사유", "공동사업자", "사업자단위과세적용사업자여부",
+    "전자세금계산서전용전자우편주소", "주민등록번호",
+]
+
+ADDRESS_REGIONS = (
+    "서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "경기", "강원",
+    "충청", "충북", "충남", "전라", "전북", "전남", "경상", "경북", "경남", "제주",
+)
+
+BUSINESS_NUMBER_WEIGHTS = (1, 3, 7, 1, 3, 7, 1, 3, 5)
+
+BUSINESS_NUMBER_PATTERN = re.compile(r'(?<!\d)(\d{3})\s*-?\s*(\d{2})\s*-?\s*(\d{5})(?!\d)')
+CORPORATE_NUMBER_PATTERN = re.compile(r'(?<!\d)(\d{6})\s*-?\s*(\d{7})(?!\d)')
+DATE_PATTERN = re.compile(r'(\d{4})\s*[년.\-/]\s*(\d{1,2})\s*[월.\-/]\s*(\d{1,2})')
+NAME_PATTERN = re.compile(r'[가-힣]{2,5}')
+GIBBERISH_PATTERN = re.compile(r'[A-Z]{3,}')
+
+
+def merge_spaced_korean_words(text):
+    """
+    공백으로 분리된 한글 단어 결합 (Text Chunking)
+    예: "도 소 매" -> "도소매"
+    """
+    # 한글 문자 사이의 단일 공백 제거 (한글+공백+한글 패턴)
+    pattern = r'([\uac00-\ud7a3])\s+(?=[\uac00-\ud7a3])'
+    return re.sub(pattern, r'\1', text)
+
+
+def _label_pattern(label):
+    """'대표자' -> 글자 사이 공백을 허용하는 라벨 패턴 (한글 공백 병합으로 앞 글자에 붙어 있을 수 있음)"""
+    chars = [re.escape(c) for c in label if not c.isspace()]
+    return r'\s*'.join(chars)
+
+
+def _compile_labels():
+    field_patterns = {
+        field: [re.compile(_label_pattern(label)) for label in labels]
+        for field, labels in FIELD_LABELS.items()
+    }
+    all_labels = [label for labels in FIELD_LABELS.values() for label in labels] + STOP_LABELS
+    any_label = re.compile('|'.join(_label_pattern(label) for label in all_labels))
+    return field_patterns, any_label
+
+
+FIELD_PATTERNS, ANY_LABEL_PATTERN = _compile_labels()
+
+# 라벨 앞 두 글자 (이름 뒤에 잘린 라벨 조각이 붙었는지 판단, 예: "홍길동생년")
+LABEL_PREFIXES = sorted({
+    re.sub(r'\s+', '', label)[:2]
+    for label in [label for labels in FIELD_LABELS.values() for label in labels] + STOP_LABELS
+})
+
+
+# ===============================================
+# 검증
+# ===============================================
+
+def is_valid_business_number(digits):
+    """사업자등록번호 10자리 체크섬 검증"""
+    if not re.fullmatch(r'\d{10}', digits):
+        return False
+    numbers = [int(d) for d in digits]
+    total = sum(n * w for n, w in zip(numbers, BUSINESS_NUMBER_WEIGHTS))
+    total += (numbers[8] * 5) // 10
+    return (10 - total % 10) % 10 == numbers[9]
+
+
+def is_valid_corporate_number(digits):
+    """법인등록번호 13자리 체크섬 검증"""
+    if not re.fullmatch(r'\d{13}', digits):
+        return False
+    numbers = [int(d) for d in digits]
+    total = sum(n * (1 if i % 2 == 0 else 2) for i, n in enumerate(numbers[:12]))
+    return (10 - total % 10) % 10 == numbers[12]
+
+
+def _normalize_business_number(value):
+    match = BUSINESS_NUMBER_PATTERN.search(value)
+    if not match:
+        return value.strip(), False
+    digits = ''.join(match.groups())
+    return f"{digits[:3]}-{digits[3:5]}-{digits[5:]}", is_valid_business_number(digits)
+
+
+def _normalize_corporate_number(value):
+    match = CORPORATE_NUMBER_PATTERN.search(value)
+    if not match:
+        return value.strip(), False
+    digits = ''.join(match.groups())
+    return f"{digits[:6]}-{digits[6:]}", is_valid_corporate_number(digits)
+
+
+def _normalize_date(value):
+    match = DATE_PATTERN.search(value)
+    if not match:
+        return value.strip(), False
+    year, month, day = (int(group) for group in match.groups())
+    try:
+        date = datetime.date(year, month, day)
+    except ValueError:
+        return value.strip(), False
+    return date.isoformat(), 1900 <= year and date <= datetime.date.today()
+
+
+def _normalize_name(value):
+    """
+    이름 전체가 한글 2~5자일 때만 유효
+    다음 라벨(또는 잘린 라벨 조각)까지 이어 붙은 값은 잘라내지 않고 실패 처리 → LLM 으로 넘김
+    """
+    compact = re.sub(r'\s+', '', value)
+    runs_into_label = (ANY_LABEL_PATTERN.search(compact) is not None
+                       or any(prefix in compact[1:] for prefix in LABEL_PREFIXES))
+    return compact, bool(NAME_PATTERN.fullmatch(compact)) and not runs_into_label
+
+
+def _normalize_address(value):
+    address = re.sub(r'\s+', ' ', value).strip()
+    return address, address.startswith(ADDRESS_REGIONS) and len(address) >= 8
+
+
+def _normalize_text(value):
+    text = re.sub(r'\s+', ' ', value).strip()
+    return text, bool(text) and len(text) <= 50 and not GIBBERISH_PATTERN.search(text)
+
+
+def _normalize_category(value):
+    text = re.sub(r'\s+', ' ', value).strip()
+    return text, bool(re.search(r'[가-힣]', text))
+
+
+NORMALIZERS = {
+    "businessNumber": _normalize_business_number,
+    "corporateNumber": _normalize_corporate_number,
+    "merchantName": _normalize_text,
+    "representativeName": _normalize_name,
+    "openingDate": _normalize_date,
+    "address": _normalize_address,
+    "headOfficeAddress": _normalize_address,
+    "businessType": _normalize_category,
+    "businessItem": _normalize_category,
+}
+
+
+# ===============================================
+# 추출
+# ===============================================
+
+def _labeled_candidates(field, lines):
+    """
+    라벨 뒤의 (값, 신뢰도) 후보 제너레이터 (라인 순서)
+    같은 줄에 다른 라벨이 나오면 그 앞까지만, 값이 비어 있으면 다음 줄 사용
+    """
+    for index, line in enumerate(lines):
+        text = line['text']
+        for pattern in FIELD_PATTERNS[field]:
+            for match in pattern.finditer(text):
+                remainder = text[match.end():]
+                remainder = re.sub(r'^[\s:：;)\]]+', '', remainder)
+                stop = ANY_LABEL_PATTERN.search(remainder)
+                value = (remainder[:stop.start()] if stop else remainder).strip()
+                confidence = line['confidence']
+
+                if not value and index + 1 < len(lines):
+                    next_line = lines[index + 1]
+                    if not ANY_LABEL_PATTERN.match(next_line['text'].strip()):
+                        value = next_line['text'].strip()
+                        confidence = min(confidence, next_line['confidence'])
+
+                if value:
+                    yield value, confidence
+
+
+def _find_labeled_value(field, lines):
+    """
+    검증을 통과하는 첫 후보의 (정규화 값, 신뢰도, 유효 여부), 없으면 첫 후보
+    (예: '등록번호' 라벨이 '주민등록번호' 안에서도 잡히므로 검증 결과로 구분)
+    """
+    first = None
+    for value, confidence in _labeled_candidates(field, lines):
+        normalized, valid = NORMALIZERS[field](value)
+        if valid:
+            return normalized, confidence, True
+        if first is None:
+            first = (normalized, confidence, False)
+    return first
+
+
+def _scan_business_number(lines):
+    """
+    라벨을 찾지 못한 경우 체크섬이 맞는 번호 패턴을 전체 라인에서 탐색
+    (임의의 10자리 숫자도 약 1/10 확률로 체크섬을 통과하므로, 신뢰도를 MIN_FIELD_CONFIDENCE 미만으로 제한해
+     탐색 결과만으로는 complete 가 되지 않음 → LLM 추출로 확인)
+    """
+    for line in lines:
+        for match in BUSINESS_NUMBER_PATTERN.finditer(line['text']):
+            digits = ''.join(match.groups())
+            if is_valid_business_number(digits):
+                return match.group(0), min(line['confidence'] * 0.9, MIN_FIELD_CONFIDENCE * 0.99)
+    return None, 0.0
+
+
+def extract_business_license_fields(lines):
+    """
+    병합된 라인([{text, confidence}])에서 사업자등록증 필드 추출
+
+    Returns:
+        {
+            "fields": {필드명: {"value", "confidence", "valid"}},
+            "complete": 필수 필드 전체 검증 통과 여부,
+            "missing": 검증을 통과하지 못한 필수 필드,
+            "elapsed_ms": 추출 시간
+        }
+    """
+    start = time.perf_counter()
+    fields = {}
+
+    for field in FIELD_LABELS:
+        found = _find_labeled_value(field, lines)
+        # 라벨 후보가 하나라도 있으면(체크섬 실패 포함) 다른 번호(전화번호 등)로 대체하지 않음
+        if found is None and field == "businessNumber":
+            value, confidence = _scan_business_number(lines)
+            if value is not None:
+                found = NORMALIZERS[field](value)[0], confidence, True
+        if found is None:
+            continue
+
+        normalized, confidence, valid = found
+        fields[field] = {
+            "value": normalized,
+            # 검증 실패 시 신뢰도 절반으로 감점
+            "confidence": round(confidence * (1.0 if valid else 0.5), 3),
+            "valid": valid,
+        }
+
+    missing = [
+        field for field in REQUIRED_FIELDS
+        if field not in fields
+        or not fields[field]["valid"]
+        or fields[field]["confidence"] < MIN_FIELD_CONFIDENCE
+    ]
+
+    return {
+        "fields": fields,
+        "complete": not missing,
+        "missing": missing,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
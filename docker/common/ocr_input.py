@@ -0,0 +1,137 @@
+"""
+OCR 요청 입력 공통 모듈
+요청에서 이미지/문서 바이트를 읽어옴
+
+지원 형식 (우선순위 순):
+1. 이미지 참조 (같은 호스트의 클라이언트용, 복사/직렬화 없이 읽기 전용 매핑)
+   - 'image_shm': POSIX 공유 메모리 세그먼트 이름 (SHM_DIR 기준, 예: "ocr-1234")
+   - 'image_path': 공유 tmpfs 볼륨의 파일 경로 (SHARED_IMAGE_DIR 하위만 허용)
+   - 'image_size': 매핑할 바이트 수 (선택, 세그먼트가 이미지보다 클 때)
+   쿼리 파라미터, form 필드 또는 JSON 필드로 전달
+2. Multipart form-data: 'image_file' 필드 (없으면 첫 번째 파일 필드)
+3. JSON: 'image_base64' 필드로 Base64 인코딩된 데이터 (data:...;base64, prefix 허용)
+
+참조 수명 규약:
+- 세그먼트/파일은 클라이언트가 생성하고, 응답을 받은 뒤 클라이언트가 삭제(shm_unlink, unlink)
+- 서버는 읽기 전용으로 열어 매핑만 하고 파일 디스크립터는 즉시 닫음 (쓰기/삭제하지 않음)
+- 매핑은 요청 처리가 끝나 마지막 참조가 사라질 때 해제됨
+  (처리 중에 클라이언트가 삭제해도 매핑된 내용은 해제 전까지 유효)
+- 처리 중에 내용을 덮어쓰면 안 됨 (세그먼트를 재사용하려면 응답 이후에)
+
+참조를 매핑할 수 없으면 같은 요청의 업로드(image_file, image_base64)로 fallback 하고,
+업로드도 없으면 ImageRefError (서버는 422 응답 → 클라이언트가 일반 업로드로 재전송)
+"""
+
+import base64
+import mmap
+import os
+import re
+
+from flask import request
+
+# POSIX 공유 메모리 마운트 위치 (서버와 클라이언트가 같은 IPC 네임스페이스를 공유해야 함)
+SHM_DIR = os.environ.get("SHM_DIR", "/dev/shm")
+# 클라이언트와 공유하는 tmpfs 볼륨 (docker-compose 에서 읽기 전용으로 마운트)
+SHARED_IMAGE_DIR = os.environ.get("SHARED_IMAGE_DIR", "/handoff")
+
+# shm_open 이름 규칙 (선행 '/' 허용, 그 외 '/' 불가)
+SHM_NAME_PATTERN = re.compile(r'^/?[A-Za-z0-9._-]+$')
+
+
+class ImageRefError(Exception):
+    """이미지 참조를 매핑할 수 없고 fallback 업로드도 없는 경우"""
+
+
+def _ref_params():
+    """쿼리 파라미터, form 필드, JSON 필드에서 이미지 참조 추출"""
+    params = {}
+    for key in ('image_shm', 'image_path', 'image_size'):
+        value = request.args.get(key) or request.form.get(key)
+        if value is None and request.is_json:
+            value = (request.get_json(silent=True) or {}).get(key)
+        if value not in (None, ''):
+            params[key] = value
+    return params
+
+
+def _resolve_ref(params):
+    """참조를 실제 파일 경로로 변환 (허용된 디렉토리 밖이면 ImageRefError)"""
+    if 'image_shm' in params:
+        name = str(params['image_shm'])
+        if not SHM_NAME_PATTERN.match(name):
+            raise ImageRefError(f"Invalid shared memory name: {name}")
+        return os.path.join(SHM_DIR, name.lstrip('/'))
+
+    base = os.path.realpath(SHARED_IMAGE_DIR)
+    path = os.path.realpath(os.path.join(base, str(params['image_path'])))
+    if os.path.commonpath([base, path]) != base:
+        raise ImageRefError(f"image_path must be inside {SHARED_IMAGE_DIR}")
+    return path
+
+
+def map_image_ref(path, size=None):
+    """
+    파일을 읽기 전용으로 매핑 (복사 없음)
+
+    Returns:
+        memoryview (bytes 처럼 슬라이싱, np.frombuffer 가능)
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError as e:
+        raise ImageRefError(f"Cannot open image reference: {e.strerror}")
+    try:
+        file_size = os.fstat(fd).st_size
+        length = file_size if size is None else int(size)
+        if length <= 0 or length > file_size:
+            raise ImageRefError(f"Invalid image size {length} (segment size {file_size})")
+        # 매핑 후에는 디스크립터가 필요 없음 (매핑은 해제 전까지 유효)
+        mapped = mmap.mmap(fd, length, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise ImageRefError(f"Cannot map image reference: {e}")
+    finally:
+        os.close(fd)
+    return memoryview(mapped)
+
+
+def _read_upload():
+    """업로드된 이미지 바이트 (없으면 None)"""
+    # 1. Multipart form-data 방식 (파일 업로드)
+    if 'image_file' in request.files:
+        return request.files['image_file'].read()
+
+    # 2. JSON 방식 (Base64 인코딩)
+    if request.is_json:
+        data = request.get_json(silent=True)
+        if data and 'image_base64' in data:
+            image_base64 = data['image_base64']
+            # data:image/xxx;base64, prefix 제거
+            if ',' in image_base64:
+                image_base64 = image_base64.split(',')[1]
+            return base64.b64decode(image_base64)
+        return None
+
+    # 3. multipart 다른 필드명
+    for key in request.files:
+        return request.files[key].read()
+
+    return None
+
+
+def read_image_bytes():
+    """
+    요청에서 이미지 바이트 추출 (없으면 None)
+    참조로 전달된 경우 읽기 전용 memoryview, 업로드는 bytes
+    """
+    params = _ref_params()
+    if 'image_shm' in params or 'image_path' in params:
+        try:
+            return map_image_ref(_resolve_ref(params), params.get('image_size'))
+        except (ImageRefError, ValueError) as e:
+            upload = _read_upload()
+            if upload is None:
+                raise ImageRefError(str(e))
+            print(f"[ocr_input] Image reference unavailable, using upload: {e}")
+            return upload
+
+    return _read_upload()
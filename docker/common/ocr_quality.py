@@ -0,0 +1,66 @@
+"""
+OCR 품질 추정 공통 모듈
+RapidOCR 서버와 앙상블 게이트웨이가 같은 기준으로 결과 품질을 평가하기 위해 공유
+"""
+
+import re
+
+
+def estimate_ocr_success(lines, full_text):
+    """
+    OCR 성공률 추정
+    - 한글 비율: 사업자등록증은 한글이 많아야 함
+    - 평균 신뢰도: OCR 엔진의 confidence 점수
+    - 의미 있는 단어 비율: 알려진 키워드 매칭
+    """
+    if not lines or not full_text:
+        return 0.0, "NO_TEXT", {
+            "korean_ratio": 0.0,
+            "avg_confidence": 0.0,
+            "keyword_score": 0.0,
+            "gibberish_penalty": 0.0,
+            "matched_keywords": 0
+        }
+    
+    # 1. 한글 비율 계산
+    korean_chars = sum(1 for c in full_text if '\uac00' <= c <= '\ud7a3')
+    total_chars = len(full_text.replace('\n', '').replace(' ', ''))
+    korean_ratio = korean_chars / max(total_chars, 1)
+    
+    # 2. 평균 신뢰도
+    avg_confidence = sum(line['confidence'] for line in lines) / max(len(lines), 1)
+    
+    # 3. 키워드 매칭
+    keywords = ['국세청', '사업자', '등록', '번호', '대표자', '법인', '개업', 
+                '소재지', '업태', '종목', '제조', '도소매', '전화', '세무서']
+    matched_keywords = sum(1 for kw in keywords if kw in full_text)
+    keyword_score = min(matched_keywords / 10, 1.0)  # 최대 1.0
+    
+    # 4. 비정상 문자 패턴 (연속 영문 대문자 = 깨진 문자일 가능성)
+    gibberish_patterns = re.findall(r'[A-Z]{3,}', full_text)
+    gibberish_penalty = min(len(gibberish_patterns) * 0.1, 0.5)
+    
+    # 5. 종합 점수 계산
+    # 한글 비율(40%) + 신뢰도(30%) + 키워드(30%) - 깨진 문자 페널티
+    success_rate = (korean_ratio * 0.4 + avg_confidence * 0.3 + keyword_score * 0.3) - gibberish_penalty
+    success_rate = max(0.0, min(1.0, success_rate))
+    
+    # 레벨 결정
+    if success_rate >= 0.8:
+        level = "EXCELLENT"
+    elif success_rate >= 0.6:
+        level = "GOOD"
+    elif success_rate >= 0.4:
+        level = "FAIR"
+    elif success_rate >= 0.2:
+        level = "POOR"
+    else:
+        level = "VERY_POOR"
+    
+    return success_rate, level, {
+        "korean_ratio": round(korean_ratio, 3),
+        "avg_confidence": round(avg_confidence, 3),
+        "keyword_score": round(keyword_score, 3),
+        "gibberish_penalty": round(gibberish_penalty, 3),
+        "matched_keywords": matched_keywords
+    }
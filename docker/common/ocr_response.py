@@ -0,0 +1,161 @@
+"""
+OCR 응답 직렬화 공통 모듈
+RapidOCR / Pororo / EasyOCR 서버가 공유하는 콘텐츠 협상(Content Negotiation) 로직
+
+요청 파라미터 (query string, form-data, JSON body 어디서든 지정 가능):
+- fields: 반환할 최상위 필드 목록 (예: fields=text,lines)
+          success / error 는 실패 판별을 위해 항상 포함
+- boxes:  1/true 이면 라인별 박스 좌표 [x_min, y_min, x_max, y_max]를 packed array로 포함
+- format: json | msgpack (지정 시 Accept 헤더보다 우선)
+
+인코딩:
+- JSON: orjson 설치 시 orjson, 없으면 표준 json 모듈
+- MessagePack: Accept: application/msgpack 또는 format=msgpack (msgpack 설치 필요)
+"""
+
+import base64
+import json
+
+import numpy as np
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPES = ("application/msgpack", "application/x-msgpack")
+
+# 필드 선택과 무관하게 항상 포함되는 필드
+ALWAYS_INCLUDED_FIELDS = ("success", "error")
+
+
+def _request_params():
+    """query string, form-data, JSON body 파라미터를 하나로 합침 (뒤쪽이 우선)"""
+    params = {}
+    params.update(request.args.to_dict())
+    params.update(request.form.to_dict())
+    if request.is_json:
+        body = request.get_json(silent=True)
+        if isinstance(body, dict):
+            for key in ("fields", "boxes", "format"):
+                if key in body:
+                    params[key] = body[key]
+    return params
+
+
+def _parse_fields(value):
+    if not value:
+        return None
+    if isinstance(value, (list, tuple)):
+        return {str(field).strip() for field in value if str(field).strip()}
+    return {field.strip() for field in str(value).split(',') if field.strip()}
+
+
+def _is_truthy(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def wants_boxes():
+    """요청이 박스 좌표 포함을 원하는지 여부"""
+    return _is_truthy(_request_params().get("boxes", False))
+
+
+def negotiate_format():
+    """응답 포맷 결정: 'msgpack' 또는 'json'"""
+    fmt = str(_request_params().get("format", "")).strip().lower()
+    if fmt in ("msgpack", "json"):
+        return fmt if fmt == "json" or msgpack is not None else "json"
+
+    best = request.accept_mimetypes.best_match(
+        (JSON_MIMETYPE,) + MSGPACK_MIMETYPES, default=JSON_MIMETYPE
+    )
+    if best in MSGPACK_MIMETYPES and msgpack is not None:
+        return "msgpack"
+    return "json"
+
+
+def box_to_rect(points):
+    """사각형 꼭짓점 [[x1,y1], ..., [x4,y4]] -> 축 정렬 박스 [x_min, y_min, x_max, y_max]"""
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    return [int(round(min(xs))), int(round(min(ys))), int(round(max(xs))), int(round(max(ys)))]
+
+
+def pack_boxes(boxes, binary):
+    """
+    박스 좌표를 packed array로 변환
+    - data: little-endian int32 배열 (shape = [라인 수, 4])
+    - binary=True (MessagePack) 이면 raw bytes, 아니면 base64 문자열
+    """
+    packed = np.asarray(boxes, dtype='<i4').reshape(-1, 4)
+    data = packed.tobytes()
+    return {
+        "dtype": "int32",
+        "shape": list(packed.shape),
+        "data": data if binary else base64.b64encode(data).decode('ascii'),
+    }
+
+
+def _default(obj):
+    """numpy 스칼라/배열 등 기본 인코더가 처리하지 못하는 타입 변환"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+
+def encode_json(payload):
+    """JSON 직렬화 (orjson 우선)"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_default, ensure_ascii=False).encode('utf-8')
+
+
+def encode_msgpack(payload):
+    """MessagePack 직렬화"""
+    return msgpack.packb(payload, default=_default, use_bin_type=True)
+
+
+def select_fields(payload):
+    """fields 파라미터가 있으면 지정한 필드만 남김 (boxes 를 명시적으로 요청했다면 함께 유지)"""
+    fields = _parse_fields(_request_params().get("fields"))
+    if not fields:
+        return payload
+    fields.add("boxes")
+    return {
+        key: value for key, value in payload.items()
+        if key in fields or key in ALWAYS_INCLUDED_FIELDS
+    }
+
+
+def render(payload, status=200, boxes=None):
+    """
+    OCR 응답 생성 (jsonify 대체)
+
+    Args:
+        payload: 응답 dict
+        status: HTTP 상태 코드
+        boxes: 라인별 [x_min, y_min, x_max, y_max] 목록 (boxes 요청 시에만 포함)
+    """
+    fmt = negotiate_format()
+    params = _request_params()
+
+    if boxes is not None and _is_truthy(params.get("boxes", False)):
+        payload = dict(payload)
+        payload["boxes"] = pack_boxes(boxes, binary=(fmt == "msgpack"))
+
+    payload = select_fields(payload)
+
+    if fmt == "msgpack":
+        return Response(encode_msgpack(payload), status=status, mimetype=MSGPACK_MIMETYPES[0])
+    return Response(encode_json(payload), status=status, mimetype=JSON_MIMETYPE)
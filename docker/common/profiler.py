@@ -0,0 +1,184 @@
+"""
+온디맨드 프로파일링 공통 모듈
+OCR 서버에 /debug/profile 엔드포인트를 추가 (admin_guard 로 보호)
+
+- mode=cpu (기본): 모든 요청 스레드를 주기적으로 샘플링 (sys._current_frames)
+  → collapsed stacks 텍스트 (flamegraph.pl, speedscope 에 그대로 입력 가능)
+- mode=alloc: 측정 구간 동안 tracemalloc 으로 할당 추적, 주기적 스냅샷 → 위치별 최대 크기 기준 상위 할당 위치
+
+프로파일이 실행 중이 아닐 때는 훅/트레이서를 설치하지 않으므로 오버헤드 없음
+
+사용 예:
+    curl -H "X-Admin-Token: $TOKEN" "http://localhost:9003/debug/profile?seconds=10" > ocr.collapsed
+    flamegraph.pl ocr.collapsed > ocr.svg
+    curl -H "X-Admin-Token: $TOKEN" "http://localhost:9003/debug/profile?seconds=10&mode=alloc&limit=20"
+"""
+
+import collections
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+from flask import Blueprint, Response, jsonify, request
+
+from admin_guard import require_admin_token
+
+MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS", 60))
+DEFAULT_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 10))
+# alloc 모드 스냅샷 간격 (짧을수록 수명이 짧은 할당을 더 잘 잡지만 스냅샷 비용이 커짐)
+DEFAULT_SNAPSHOT_INTERVAL_MS = float(os.environ.get("PROFILE_SNAPSHOT_INTERVAL_MS", 200))
+# tracemalloc traceback 깊이 상한
+MAX_FRAMES = 100
+
+# 동시에 하나의 프로파일만 실행
+_profile_lock = threading.Lock()
+
+debug_blueprint = Blueprint('debug', __name__)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_stacks(seconds, interval):
+    """
+    seconds 동안 interval 간격으로 모든 스레드의 스택을 샘플링 (호출한 스레드 제외)
+
+    Returns:
+        (collapsed stacks 카운터 {"thread;outer;...;inner": count}, 샘플링 횟수)
+    """
+    stacks = collections.Counter()
+    sampler_ident = threading.get_ident()
+    deadline = time.perf_counter() + seconds
+    samples = 0
+
+    while time.perf_counter() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == sampler_ident:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}"))
+            stacks[';'.join(reversed(labels))] += 1
+        samples += 1
+        time.sleep(interval)
+
+    return stacks, samples
+
+
+def _site_sizes(snapshot, filters):
+    """스냅샷의 할당 위치(traceback)별 (크기, 개수)"""
+    snapshot = snapshot.filter_traces(filters)
+    return {stat.traceback: (stat.size, stat.count) for stat in snapshot.statistics('traceback')}
+
+
+def allocation_snapshot(seconds, limit, frames, snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL_MS / 1000):
+    """
+    seconds 동안 tracemalloc 으로 할당을 추적하며 snapshot_interval 마다 스냅샷을 찍고,
+    할당 위치별로 관측된 최대 크기 기준 상위 위치 반환
+    (구간 끝에 해제된 임시 복사본도 살아 있던 시점의 스냅샷에 잡힘.
+     단, 두 스냅샷 사이에 생성되고 해제된 할당은 위치별 최대값에 나타나지 않고 traced_peak_kb 에만 반영됨)
+    (이미 tracemalloc 이 실행 중이면 그대로 사용하고 종료하지 않음)
+    """
+    filters = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    )
+    peaks = {}
+    snapshots = 0
+
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(frames)
+    try:
+        deadline = time.perf_counter() + seconds
+        while True:
+            time.sleep(max(min(snapshot_interval, deadline - time.perf_counter()), 0))
+            for site, (size, count) in _site_sizes(tracemalloc.take_snapshot(), filters).items():
+                if size > peaks.get(site, (0, 0))[0]:
+                    peaks[site] = (size, count)
+            snapshots += 1
+            if time.perf_counter() >= deadline:
+                break
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    top = []
+    for site, (size, count) in sorted(peaks.items(), key=lambda item: item[1][0], reverse=True)[:limit]:
+        top.append({
+            "size_kb": round(size / 1024, 1),
+            "count": count,
+            "traceback": [f"{frame.filename}:{frame.lineno}" for frame in site],
+        })
+    return {
+        "traced_current_kb": round(current / 1024, 1),
+        "traced_peak_kb": round(peak / 1024, 1),
+        "snapshots": snapshots,
+        "top": top,
+    }
+
+
+def _float_arg(name, default):
+    """실수 쿼리 파라미터 (NaN/inf 는 min/max 로 제한되지 않으므로 ValueError)"""
+    value = float(request.args.get(name, default))
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number")
+    return value
+
+
+@debug_blueprint.route('/debug/profile', methods=['GET'])
+@require_admin_token
+def profile():
+    """
+    프로파일링 엔드포인트
+
+    Query:
+    - seconds: 측정 시간 (기본 10, 최대 PROFILE_MAX_SECONDS)
+    - mode: cpu (기본) | alloc
+    - interval_ms: cpu 모드 샘플링 간격 (기본 10ms)
+    - limit: alloc 모드 상위 할당 위치 수 (기본 25, 최소 1)
+    - frames: alloc 모드 traceback 깊이 (기본 5, 1 ~ MAX_FRAMES)
+    - snapshot_ms: alloc 모드 스냅샷 간격 (기본 PROFILE_SNAPSHOT_INTERVAL_MS, 최소 10ms)
+    """
+    try:
+        seconds = min(max(_float_arg('seconds', 10), 0.1), MAX_SECONDS)
+        mode = request.args.get('mode', 'cpu')
+        interval = max(_float_arg('interval_ms', DEFAULT_INTERVAL_MS), 1.0) / 1000
+        limit = max(int(request.args.get('limit', 25)), 1)
+        frames = min(max(int(request.args.get('frames', 5)), 1), MAX_FRAMES)
+        snapshot_interval = max(_float_arg('snapshot_ms', DEFAULT_SNAPSHOT_INTERVAL_MS), 10.0) / 1000
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    if mode not in ('cpu', 'alloc'):
+        return jsonify({"success": False, "error": "mode must be 'cpu' or 'alloc'"}), 400
+
+    if not _profile_lock.acquire(blocking=False):
+        return jsonify({"success": False, "error": "Another profile is already running"}), 409
+
+    try:
+        print(f"[Profiler] {mode} profile started ({seconds}s)")
+        if mode == 'alloc':
+            result = allocation_snapshot(seconds, limit, frames, snapshot_interval)
+            print(f"[Profiler] alloc profile finished ({result['snapshots']} snapshots, "
+                  f"peak {result['traced_peak_kb']}KB)")
+            return jsonify({"success": True, "mode": mode, "seconds": seconds, **result})
+
+        stacks, samples = sample_stacks(seconds, interval)
+        print(f"[Profiler] cpu profile finished ({samples} samples, {len(stacks)} stacks)")
+        body = ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        return Response(body, mimetype='text/plain', headers={
+            "Content-Disposition": f"attachment; filename=profile-{int(time.time())}.collapsed",
+            "X-Profile-Samples": str(samples),
+        })
+    finally:
+        _profile_lock.release()
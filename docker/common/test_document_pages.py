@@ -0,0 +1,118 @@
+"""
+다중 페이지 문서 처리 테스트 (OCR 엔진 대신 가짜 process_fn 사용)
+
+실행:
+    python -m pytest docker/common
+"""
+
+import io
+import json
+
+import pypdfium2 as pdfium
+import pytest
+from flask import Flask
+from PIL import Image
+
+import document_pages
+from document_pages import DocumentError, page_count, page_stream_response
+from ocr_input import map_image_ref
+
+
+def make_pdf(pages, size=(595, 842)):
+    pdf = pdfium.PdfDocument.new()
+    for _ in range(pages):
+        pdf.new_page(*size)
+    buffer = io.BytesIO()
+    pdf.save(buffer)
+    pdf.close()
+    return buffer.getvalue()
+
+
+def fake_ocr(image_bytes):
+    return {"success": True, "lines": [{"text": "사업자등록증", "confidence": 0.9}]}, None
+
+
+def stream(data):
+    """page_stream_response 를 요청 컨텍스트에서 실행하고 NDJSON 라인 목록 반환"""
+    app = Flask(__name__)
+    with app.test_request_context('/ocr/pages?stop_early=0'):
+        response = page_stream_response(data, fake_ocr)
+        body = b''.join(response.response)
+    return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.mark.parametrize("data", [
+    b'%PDF-1.7 truncated garbage',
+    b'II*\x00' + b'\x00' * 32,
+])
+def test_corrupt_document_raises_document_error(data):
+    with pytest.raises(DocumentError):
+        page_count(data)
+
+
+def test_page_rasterization_error_is_streamed_and_summary_sent(monkeypatch):
+    render = document_pages._render_pdf_page
+
+    def broken_second_page(pdf, index):
+        if index == 1:
+            raise pdfium.PdfiumError("Failed to load page")
+        return render(pdf, index)
+
+    monkeypatch.setattr(document_pages, "_render_pdf_page", broken_second_page)
+    lines = stream(make_pdf(3))
+
+    assert [line.get("page") for line in lines[:3]] == [1, 2, 3]
+    assert lines[1]["result"]["success"] is False
+    assert "Failed to load page" in lines[1]["result"]["error"]
+    assert lines[2]["result"]["success"] is True
+    assert lines[-1]["done"] is True
+    assert lines[-1]["pages_processed"] == 3
+    assert lines[-1]["pages_failed"] == 1
+
+
+def test_unreadable_document_mid_stream_still_ends_with_summary(monkeypatch):
+    def failing_pages(data):
+        yield 0, b'page-1', {}
+        raise OSError("image file is truncated")
+
+    monkeypatch.setattr(document_pages, "iter_pages", failing_pages)
+    lines = stream(make_pdf(3))
+
+    assert lines[0]["result"]["success"] is True
+    assert lines[1]["page"] == 2
+    assert "truncated" in lines[1]["result"]["error"]
+    assert lines[-1] == dict(lines[-1], done=True, pages_processed=2, pages_failed=1)
+
+
+def test_oversized_page_is_rendered_within_pixel_limit():
+    # 200 x 200 inch 페이지 (PAGE_MIN_DPI 만 적용하면 20000x20000 픽셀)
+    (index, image_bytes, meta), = document_pages.iter_pages(make_pdf(1, size=(14400, 14400)))
+
+    assert image_bytes is not None
+    assert meta["width"] * meta["height"] <= document_pages.PAGE_MAX_PIXELS
+    assert meta["dpi"] < document_pages.PAGE_MIN_DPI
+
+
+def test_regular_page_keeps_target_side():
+    # A4 는 긴 변이 PAGE_TARGET_SIDE 가 되도록 렌더링
+    assert round(document_pages.choose_dpi(595, 842) * 842 / 72) == document_pages.PAGE_TARGET_SIDE
+
+
+def test_mapped_tiff_is_read_without_copying(tmp_path, monkeypatch):
+    path = tmp_path / "scan.tif"
+    frames = [Image.new('RGB', (64, 32), color) for color in ('white', 'gray')]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+    view = map_image_ref(str(path))
+
+    def copied(*args):
+        raise AssertionError("mapped document copied into BytesIO")
+
+    # PNG 인코딩(출력)을 제외하고 BytesIO 를 쓰면 실패
+    monkeypatch.setattr(document_pages, "_encode_png", lambda image: b"png")
+    monkeypatch.setattr(document_pages.io, "BytesIO", copied)
+
+    assert page_count(view) == 2
+    pages = list(document_pages.iter_pages(view))
+    assert [(index, image_bytes, meta["width"]) for index, image_bytes, meta in pages] == [
+        (0, b"png", 64), (1, b"png", 64),
+    ]
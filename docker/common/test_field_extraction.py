@@ -0,0 +1,98 @@
+"""
+규칙 기반 필드 추출 테스트 (서버와 같은 한글 공백 병합을 거친 라인 기준)
+
+실행:
+    python -m pytest docker/common
+"""
+
+import os
+
+from bench_field_extraction import DEFAULT_SAMPLES, load_lines
+from field_extraction import (
+    MIN_FIELD_CONFIDENCE, _normalize_name, extract_business_license_fields, merge_spaced_korean_words,
+)
+
+
+def lines(*texts, confidence=0.95):
+    return [{"text": merge_spaced_korean_words(text), "confidence": confidence} for text in texts]
+
+
+def values(extraction):
+    return {field: found["value"] for field, found in extraction["fields"].items() if found["valid"]}
+
+
+def test_merged_individual_license_stops_values_at_glued_labels():
+    extraction = extract_business_license_fields(
+        load_lines(os.path.join(DEFAULT_SAMPLES, 'individual_clean.txt'))
+    )
+
+    assert values(extraction) == {
+        "businessNumber": "123-45-67891",
+        "merchantName": "길동상사",
+        "representativeName": "홍길동",
+        "openingDate": "2020-01-02",
+        "address": "서울특별시강남구테헤란로 123",
+        "businessType": "도매및소매업",
+        "businessItem": "전자상거래업",
+    }
+    assert extraction["complete"] is True
+
+
+def test_name_running_into_label_is_invalid():
+    assert _normalize_name("홍길동생년") == ("홍길동생년", False)
+    assert _normalize_name("홍길동생년월일") == ("홍길동생년월일", False)
+    assert _normalize_name("홍 길 동") == ("홍길동", True)
+
+
+def test_unrecognized_stop_label_blocks_fast_path():
+    # 생년월일 라벨이 깨져 값에 이어 붙은 경우 이름을 잘라내지 않고 LLM 으로 넘김
+    extraction = extract_business_license_fields(lines(
+        "등록번호 : 123-45-67891",
+        "상호 : 길동상사",
+        "성명 : 홍길동 생넌월일 : 1980 년 05 월 17 일",
+        "개업연월일 : 2020 년 01 월 02 일",
+        "사업장소재지 : 서울특별시 강남구 테헤란로 123",
+    ))
+
+    assert extraction["fields"]["representativeName"]["valid"] is False
+    assert "representativeName" in extraction["missing"]
+    assert extraction["complete"] is False
+
+
+def test_resident_number_label_does_not_shadow_business_number():
+    extraction = extract_business_license_fields(lines(
+        "성명 : 홍길동 주민등록번호 : 800517-1******",
+        "등록번호 : 123-45-67891",
+    ))
+
+    assert extraction["fields"]["businessNumber"] == {
+        "value": "123-45-67891", "confidence": 0.95, "valid": True,
+    }
+
+
+def test_invalid_labeled_number_is_not_replaced_by_phone_number():
+    extraction = extract_business_license_fields(lines(
+        "등록번호 : 123-45-67890",
+        "전화번호 : 0312340005",
+    ))
+
+    assert extraction["fields"]["businessNumber"]["value"] == "123-45-67890"
+    assert extraction["fields"]["businessNumber"]["valid"] is False
+    assert "businessNumber" in extraction["missing"]
+    assert extraction["complete"] is False
+
+
+def test_scanned_number_alone_never_completes_extraction():
+    extraction = extract_business_license_fields(lines(
+        "123-45-67891",
+        "상호 : 길동상사",
+        "성명 : 홍길동",
+        "개업연월일 : 2020 년 01 월 02 일",
+        "사업장소재지 : 서울특별시 강남구 테헤란로 123",
+    ))
+
+    number = extraction["fields"]["businessNumber"]
+    assert number["value"] == "123-45-67891" and number["valid"] is True
+    assert number["confidence"] < MIN_FIELD_CONFIDENCE
+    assert extraction["missing"] == ["businessNumber"]
+    assert extraction["complete"] is False
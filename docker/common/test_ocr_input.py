@@ -0,0 +1,83 @@
+"""
+이미지 참조(image_path, image_shm) 입력 테스트
+
+실행:
+    python -m pytest docker/common
+"""
+
+import base64
+import os
+
+import pytest
+from flask import Flask
+
+import ocr_input
+from ocr_input import ImageRefError, read_image_bytes
+
+IMAGE = b"\x89PNG fake image bytes"
+UPLOAD = b"uploaded image bytes"
+
+app = Flask(__name__)
+
+
+@pytest.fixture
+def handoff(tmp_path, monkeypatch):
+    """SHARED_IMAGE_DIR 로 쓰는 디렉토리와 그 밖의 파일"""
+    shared = tmp_path / "handoff"
+    shared.mkdir()
+    (shared / "page.img").write_bytes(IMAGE)
+    (tmp_path / "secret.img").write_bytes(b"outside of the shared directory")
+    monkeypatch.setattr(ocr_input, "SHARED_IMAGE_DIR", str(shared))
+    return shared
+
+
+def read(query, upload=False):
+    """요청 컨텍스트에서 read_image_bytes 호출 (upload=True 면 image_base64 도 함께 전달)"""
+    body = {"image_base64": base64.b64encode(UPLOAD).decode()} if upload else None
+    with app.test_request_context('/ocr', method='POST', query_string=query, json=body):
+        data = read_image_bytes()
+        return bytes(data) if data is not None else None
+
+
+def test_image_path_is_mapped(handoff):
+    assert read({"image_path": "page.img"}) == IMAGE
+    assert read({"image_path": "page.img", "image_size": "4"}) == IMAGE[:4]
+
+
+@pytest.mark.parametrize("image_path", ["../secret.img", "nested/../../secret.img"])
+def test_image_path_outside_shared_dir_is_rejected(handoff, image_path):
+    with pytest.raises(ImageRefError, match="must be inside"):
+        read({"image_path": image_path})
+
+
+def test_symlink_pointing_outside_shared_dir_is_rejected(handoff):
+    os.symlink(handoff.parent / "secret.img", handoff / "link.img")
+
+    with pytest.raises(ImageRefError, match="must be inside"):
+        read({"image_path": "link.img"})
+
+
+def test_missing_reference_without_upload_raises(handoff):
+    # 서버는 ImageRefError 를 422 로 응답 → 클라이언트가 일반 업로드로 재전송
+    with pytest.raises(ImageRefError, match="Cannot open"):
+        read({"image_path": "missing.img"})
+
+
+def test_missing_reference_falls_back_to_upload(handoff):
+    assert read({"image_path": "missing.img"}, upload=True) == UPLOAD
+
+
+@pytest.mark.parametrize("image_size", ["0", "-1", str(len(IMAGE) + 1), "abc"])
+def test_invalid_image_size_is_rejected(handoff, image_size):
+    with pytest.raises(ImageRefError):
+        read({"image_path": "page.img", "image_size": image_size})
+
+
+def test_invalid_image_size_falls_back_to_upload(handoff):
+    assert read({"image_path": "page.img", "image_size": "0"}, upload=True) == UPLOAD
+
+
+@pytest.mark.parametrize("name", ["../etc/passwd", "a/b", "name with spaces"])
+def test_invalid_shared_memory_name_is_rejected(handoff, name):
+    with pytest.raises(ImageRefError, match="Invalid shared memory name"):
+        read({"image_shm": name})
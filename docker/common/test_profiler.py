@@ -0,0 +1,69 @@
+"""
+온디맨드 프로파일러 테스트
+
+실행:
+    python -m pytest docker/common
+"""
+
+import threading
+import time
+import tracemalloc
+
+import pytest
+from flask import Flask
+
+import admin_guard
+import profiler
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(admin_guard, "ADMIN_TOKEN", "test-token")
+    app = Flask(__name__)
+    app.register_blueprint(profiler.debug_blueprint)
+    return app.test_client()
+
+
+def test_short_lived_allocation_is_reported_at_its_peak():
+    def copy_briefly():
+        time.sleep(0.2)
+        buffer = bytearray(8 * 1024 * 1024)
+        time.sleep(0.3)
+        del buffer
+
+    worker = threading.Thread(target=copy_briefly)
+    worker.start()
+    result = profiler.allocation_snapshot(1.0, 5, 3, 0.05)
+    worker.join()
+
+    # 측정 구간이 끝나기 전에 해제됐지만 살아 있던 시점의 스냅샷에 잡힘
+    assert result["snapshots"] > 1
+    assert result["top"][0]["size_kb"] >= 8 * 1024
+
+
+@pytest.mark.parametrize("query, status", [
+    ("frames=0", 200), ("frames=-3", 200), ("frames=100000", 200), ("limit=0", 200), ("limit=-1", 200),
+    # NaN/inf 는 min/max 로 제한되지 않으므로 거부 (seconds=nan 이면 측정이 끝나지 않음)
+    ("seconds=nan", 400), ("seconds=inf", 400), ("seconds=-inf", 400),
+    ("snapshot_ms=nan", 400), ("interval_ms=nan", 400),
+])
+def test_out_of_range_alloc_parameters_are_clamped(client, query, status):
+    response = client.get(f"/debug/profile?{query}&mode=alloc&seconds=0.1",
+                          headers={"X-Admin-Token": "test-token"})
+
+    assert response.status_code == status
+    body = response.get_json()
+    assert body["success"] is (status == 200)
+    if status == 200:
+        assert len(body["top"]) >= 1
+    # 락과 tracemalloc 이 남지 않아 다음 프로파일을 실행할 수 있음
+    assert not tracemalloc.is_tracing()
+    assert profiler._profile_lock.acquire(blocking=False)
+    profiler._profile_lock.release()
+
+
+def test_non_finite_cpu_interval_is_rejected(client):
+    response = client.get("/debug/profile?mode=cpu&seconds=0.1&interval_ms=nan",
+                          headers={"X-Admin-Token": "test-token"})
+
+    assert response.status_code == 400
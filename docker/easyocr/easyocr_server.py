@@ -3,17 +3,23 @@ EasyOCR Flask Server
 한국어 + 영어 OCR 서비스
 """
 
-import io
 import logging
+import cv2
+import numpy as np
 from flask import Flask, request, jsonify
-from PIL import Image
 import easyocr
 
+from document_pages import DocumentError, is_multipage_document, page_stream_response, process_document
+from ocr_input import ImageRefError, read_image_bytes
+from ocr_response import box_to_rect, render
+from profiler import debug_blueprint
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.register_blueprint(debug_blueprint)
 
 # EasyOCR Reader 초기화 (한국어 + 영어)
 logger.info("Initializing EasyOCR Reader (ko, en)...")
@@ -27,72 +33,139 @@ def health():
     return jsonify({"status": "healthy", "engine": "easyocr"})
 
 
+def process_ocr(image_bytes):
+    """
+    이미지 바이트로 OCR 처리
+    
+    Returns:
+        (응답 dict, 라인별 박스 좌표)
+    """
+    # 직접 디코딩 (공유 메모리 매핑(memoryview)도 복사 없이 처리, EasyOCR 은 RGB 배열 입력)
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Cannot decode image")
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    
+    logger.info(f"Processing image: {image.shape[1]}x{image.shape[0]}")
+    
+    # EasyOCR 실행
+    results = reader.readtext(image)
+    
+    # 결과 파싱
+    lines = []
+    boxes = []
+    full_text_parts = []
+    
+    for (bbox, text, confidence) in results:
+        lines.append({
+            "text": text,
+            "confidence": float(confidence)
+        })
+        boxes.append(box_to_rect(bbox))
+        full_text_parts.append(text)
+    
+    full_text = "\n".join(full_text_parts)
+    
+    # 한글 비율 계산
+    korean_chars = sum(1 for c in full_text if '\uac00' <= c <= '\ud7a3')
+    total_chars = len(full_text.replace(" ", "").replace("\n", ""))
+    korean_ratio = korean_chars / total_chars if total_chars > 0 else 0.0
+    
+    logger.info(f"OCR completed: {len(lines)} lines, korean_ratio={korean_ratio:.2f}")
+    
+    return {
+        "success": True,
+        "text": full_text,
+        "lines": lines,
+        "line_count": len(lines),
+        "korean_ratio": korean_ratio
+    }, boxes
+
+
 @app.route('/ocr', methods=['POST'])
 def ocr():
     """
     OCR 처리 엔드포인트
     
-    Request: multipart/form-data (image_file)
+    Request: multipart/form-data (image_file), JSON (image_base64)
+    또는 같은 호스트의 'image_shm'(공유 메모리) / 'image_path'(공유 볼륨) 참조 (ocr_input 모듈 참고)
+    참조를 매핑할 수 없고 업로드도 없으면 422 → 일반 업로드로 재전송
     Response: JSON {success, text, lines, line_count, error}
+    PDF/TIFF 문서는 등록번호가 있는 페이지(없으면 라인이 가장 많은 페이지) 결과를 반환
+    (page, page_count 필드 추가, 페이지별 결과는 /ocr/pages 사용)
+    
+    응답 포맷 (ocr_response 모듈 참고):
+    - fields=text,lines: 지정한 필드만 반환
+    - boxes=1: 라인별 [x_min, y_min, x_max, y_max] packed int32 배열 포함
+    - Accept: application/msgpack 또는 format=msgpack: MessagePack 인코딩
     """
     try:
         # 이미지 파일 확인
-        if 'image_file' not in request.files:
-            return jsonify({
-                "success": False,
-                "error": "No image_file provided"
-            }), 400
-        
-        file = request.files['image_file']
-        if file.filename == '':
-            return jsonify({
+        file = request.files.get('image_file')
+        if file is not None and file.filename == '':
+            return render({
                 "success": False,
                 "error": "Empty filename"
-            }), 400
-        
-        # 이미지 읽기
-        image_bytes = file.read()
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        logger.info(f"Processing image: {image.size}, mode={image.mode}")
-        
-        # EasyOCR 실행
-        results = reader.readtext(image_bytes)
+            }, 400)
         
-        # 결과 파싱
-        lines = []
-        full_text_parts = []
-        
-        for (bbox, text, confidence) in results:
-            lines.append({
-                "text": text,
-                "confidence": float(confidence)
-            })
-            full_text_parts.append(text)
-        
-        full_text = "\n".join(full_text_parts)
-        
-        # 한글 비율 계산
-        korean_chars = sum(1 for c in full_text if '\uac00' <= c <= '\ud7a3')
-        total_chars = len(full_text.replace(" ", "").replace("\n", ""))
-        korean_ratio = korean_chars / total_chars if total_chars > 0 else 0.0
+        # 이미지 읽기 (참조 → 업로드 순)
+        image_bytes = read_image_bytes()
+        if image_bytes is None:
+            return render({
+                "success": False,
+                "error": "No image_file provided"
+            }, 400)
         
-        logger.info(f"OCR completed: {len(lines)} lines, korean_ratio={korean_ratio:.2f}")
-        
-        return jsonify({
-            "success": True,
-            "text": full_text,
-            "lines": lines,
-            "line_count": len(lines),
-            "korean_ratio": korean_ratio
-        })
+        # 다중 페이지 문서는 페이지 단위로 처리
+        if is_multipage_document(image_bytes):
+            result, boxes = process_document(image_bytes, process_ocr)
+        else:
+            result, boxes = process_ocr(image_bytes)
+        return render(result, boxes=boxes)
         
+    except ImageRefError as e:
+        return render({
+            "success": False,
+            "error": str(e)
+        }, 422)
+    except DocumentError as e:
+        return render({
+            "success": False,
+            "error": str(e)
+        }, 400)
     except Exception as e:
         logger.error(f"OCR failed: {str(e)}", exc_info=True)
-        return jsonify({
+        return render({
+            "success": False,
+            "error": str(e)
+        }, 500)
+
+
+@app.route('/ocr/pages', methods=['POST'])
+def ocr_pages():
+    """
+    다중 페이지 문서(PDF, TIFF) OCR 엔드포인트
+    페이지별 결과를 NDJSON 으로 스트리밍 (document_pages 모듈 참고)
+    """
+    try:
+        image_bytes = read_image_bytes()
+    except ImageRefError as e:
+        return render({
+            "success": False,
+            "error": str(e)
+        }, 422)
+    if image_bytes is None:
+        return render({
+            "success": False,
+            "error": "No document provided"
+        }, 400)
+    try:
+        return page_stream_response(image_bytes, process_ocr)
+    except ValueError as e:  # DocumentError 포함
+        return render({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 400)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,415 @@
+"""
+앙상블 OCR 게이트웨이 (asyncio / aiohttp)
+RapidOCR, Pororo, EasyOCR 서버를 동시에 호출하고 결과가 도착하는 대로 점수를 매겨
+조기 종료 조건을 만족하면 나머지 호출을 취소
+
+- 엔진별 keep-alive 커넥션 풀 재사용 (aiohttp TCPConnector)
+- 조기 종료 정책: 품질(quality) / 엔진 간 합의(agreement) / 둘 중 하나(quality_or_agreement) / 전체 대기(all)
+- 헤지 요청: 엔진 응답이 HEDGE_DELAY 초 안에 오지 않으면 두 번째 레플리카에 같은 요청 전송
+포트: 9010
+
+엔진 주소는 환경변수로 지정 (쉼표로 구분하면 두 번째 주소가 헤지용 레플리카)
+- PADDLEOCR_URLS=http://rapidocr:9003,http://rapidocr-2:9003
+- PORORO_URLS=http://pororo:9004
+- EASYOCR_URLS=http://easyocr:9005
+로컬에서는 stub_ocr_server.py 를 띄우고 위 주소를 스텁으로 바꾸면 실제 엔진 없이 동작 확인 가능
+"""
+
+import asyncio
+import base64
+import binascii
+import difflib
+import json
+import logging
+import math
+import os
+import re
+import time
+
+import aiohttp
+from aiohttp import web
+
+from ocr_quality import estimate_ocr_success
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _parse_urls(value):
+    return [url.strip().rstrip('/') for url in value.split(',') if url.strip()]
+
+
+# 엔진 이름은 Worker(OcrRawResult.engine)와 동일하게 사용 (paddleocr = RapidOCR 서버)
+ENGINES = {
+    "paddleocr": _parse_urls(os.environ.get("PADDLEOCR_URLS", "http://rapidocr:9003")),
+    "pororo": _parse_urls(os.environ.get("PORORO_URLS", "http://pororo:9004")),
+    "easyocr": _parse_urls(os.environ.get("EASYOCR_URLS", "http://easyocr:9005")),
+}
+
+POLICIES = ("quality", "agreement", "quality_or_agreement", "all")
+
+# 기본 정책 (요청 query string 으로 개별 요청마다 변경 가능)
+DEFAULT_POLICY = {
+    "name": os.environ.get("ENSEMBLE_POLICY", "quality_or_agreement"),
+    # quality: 이 점수 이상인 결과가 하나라도 오면 종료 (0.8 = EXCELLENT)
+    "min_score": float(os.environ.get("ENSEMBLE_MIN_SCORE", 0.8)),
+    # agreement: 공백 제거 텍스트 유사도가 임계값 이상인 엔진이 N개 이상이면 종료
+    "agreement_threshold": float(os.environ.get("ENSEMBLE_AGREEMENT_THRESHOLD", 0.9)),
+    "agreement_min_engines": int(os.environ.get("ENSEMBLE_AGREEMENT_MIN_ENGINES", 2)),
+    # 전체 타임아웃 (초) - Worker의 ensemble.timeout 과 동일한 기본값
+    "timeout": float(os.environ.get("ENSEMBLE_TIMEOUT", 90)),
+    # 헤지 요청 지연 (초, 0 이하면 헤지 사용 안 함)
+    "hedge_delay": float(os.environ.get("ENSEMBLE_HEDGE_DELAY", 10)),
+}
+
+# 엔진별 커넥션 풀 크기 / keep-alive 유지 시간
+POOL_SIZE = int(os.environ.get("ENSEMBLE_POOL_SIZE", 32))
+KEEPALIVE_SECONDS = float(os.environ.get("ENSEMBLE_KEEPALIVE", 60))
+
+# 엔진에 요청할 응답 필드 (중복 필드 제외)
+RESPONSE_FIELDS = "success,error,text,lines,line_count,ocr_quality,engine"
+
+# 엔진에 그대로 전달하는 이미지 참조 필드 (ocr_input 모듈 참고)
+IMAGE_REF_KEYS = ("image_shm", "image_path", "image_size")
+
+
+def dumps(payload):
+    """JSON 직렬화 (orjson 우선)"""
+    if orjson is not None:
+        return orjson.dumps(payload).decode('utf-8')
+    return json.dumps(payload, ensure_ascii=False)
+
+
+# ===============================================
+# 엔진 호출
+# ===============================================
+
+async def call_engine(session, url, image, timeout):
+    """
+    단일 엔진 레플리카 호출 - 취소 외의 예외는 실패 결과로 변환
+    image: 이미지 바이트(multipart 업로드) 또는 이미지 참조 dict(JSON 그대로 전달)
+    """
+    if isinstance(image, dict):
+        body = {"json": image}
+    else:
+        form = aiohttp.FormData()
+        form.add_field('image_file', image, filename='image.png', content_type='image/png')
+        body = {"data": form}
+
+    start = time.perf_counter()
+    try:
+        async with session.post(
+            f"{url}/ocr",
+            params={"fields": RESPONSE_FIELDS},
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            **body
+        ) as response:
+            result = await response.json(content_type=None)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        result = {"success": False, "error": f"{type(e).__name__}: {e}"}
+
+    if not isinstance(result, dict):
+        result = {"success": False, "error": "Invalid response"}
+    result["replica"] = url
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    result["hedged"] = False
+    return result
+
+
+async def call_with_hedge(session, urls, image, timeout, hedge_delay):
+    """
+    헤지 요청: 첫 레플리카가 hedge_delay 안에 응답하지 않으면 두 번째 레플리카에도 요청하고
+    먼저 성공한 결과를 사용 (나머지는 취소)
+    """
+    primary = asyncio.ensure_future(call_engine(session, urls[0], image, timeout))
+    if len(urls) < 2 or hedge_delay <= 0:
+        return await primary
+
+    spawned = [primary]
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done and primary.result().get("success"):
+            return primary.result()
+
+        # 첫 레플리카가 느리거나 빠르게 실패한 경우 두 번째 레플리카 사용
+        secondary = asyncio.ensure_future(call_engine(session, urls[1], image, timeout))
+        spawned.append(secondary)
+        pending = {secondary} if done else {primary, secondary}
+        failure = primary.result() if done else None
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result.get("success"):
+                    result["hedged"] = True
+                    return result
+                failure = failure or result
+
+        failure["hedged"] = True
+        return failure
+    finally:
+        # 승자가 정해졌거나 상위에서 취소된 경우 남은 레플리카 호출 취소
+        for task in spawned:
+            if not task.done():
+                task.cancel()
+
+
+def score_result(result):
+    """결과 품질 점수 - 엔진이 ocr_quality 를 주면 사용, 아니면 동일 기준으로 계산"""
+    if not result.get("success"):
+        return 0.0
+    quality = result.get("ocr_quality")
+    if isinstance(quality, dict) and "success_rate" in quality:
+        return float(quality["success_rate"])
+    success_rate, _, _ = estimate_ocr_success(result.get("lines") or [], result.get("text") or "")
+    return round(success_rate, 3)
+
+
+# ===============================================
+# 조기 종료 정책
+# ===============================================
+
+def _normalize(text):
+    return re.sub(r'\s+', '', text or "")
+
+
+def _agreeing_engines(results, threshold):
+    """서로 텍스트가 임계값 이상 일치하는 엔진 중 가장 큰 그룹"""
+    texts = {
+        engine: _normalize(result.get("text"))
+        for engine, result in results.items()
+        if result.get("success") and result.get("text")
+    }
+    best = []
+    for engine, text in texts.items():
+        group = [engine]
+        for other, other_text in texts.items():
+            if other == engine:
+                continue
+            matcher = difflib.SequenceMatcher(None, text, other_text, autojunk=False)
+            # quick_ratio 는 상한값이므로 임계값 미만이면 정밀 비교 생략
+            if matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold:
+                group.append(other)
+        if len(group) > len(best):
+            best = group
+    return best
+
+
+def evaluate_policy(policy, results):
+    """정책 조건을 만족하면 사유 문자열, 아니면 None"""
+    name = policy["name"]
+
+    if name in ("quality", "quality_or_agreement"):
+        for engine, result in results.items():
+            if result.get("score", 0.0) >= policy["min_score"]:
+                return f"quality: {engine} score {result['score']:.3f} >= {policy['min_score']}"
+
+    if name in ("agreement", "quality_or_agreement"):
+        group = _agreeing_engines(results, policy["agreement_threshold"])
+        if len(group) >= policy["agreement_min_engines"]:
+            return f"agreement: {','.join(sorted(group))} >= {policy['agreement_threshold']}"
+
+    return None
+
+
+def resolve_policy(query):
+    """기본 정책에 요청별 query string 값을 덮어씀"""
+    policy = dict(DEFAULT_POLICY)
+    if query.get("policy"):
+        policy["name"] = query["policy"]
+    for key, cast in (("min_score", float), ("agreement_threshold", float),
+                      ("agreement_min_engines", int), ("timeout", float), ("hedge_delay", float)):
+        if query.get(key):
+            value = cast(query[key])
+            # NaN/inf 는 비교가 항상 거짓이라 마감 시간이 사라지므로 거부
+            if not math.isfinite(value) or value < 0:
+                raise ValueError(f"{key} must be a finite, non-negative number")
+            policy[key] = value
+    if policy["name"] not in POLICIES:
+        raise ValueError(f"Unknown policy '{policy['name']}' (expected one of {', '.join(POLICIES)})")
+    return policy
+
+
+async def run_ensemble(session, image, policy):
+    """모든 엔진 동시 호출 후 정책에 따라 조기 종료"""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    deadline = start + policy["timeout"]
+
+    tasks = {
+        asyncio.ensure_future(
+            call_with_hedge(session, urls, image, policy["timeout"], policy["hedge_delay"])
+        ): engine
+        for engine, urls in ENGINES.items() if urls
+    }
+    results = {}
+    rule_met = None
+    pending = set(tasks)
+
+    while pending:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        done, pending = await asyncio.wait(
+            pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in done:
+            engine = tasks[task]
+            result = task.result()
+            result["score"] = score_result(result)
+            results[engine] = result
+            logger.info(f"[{engine}] {'✓' if result.get('success') else '✗'} "
+                        f"score={result['score']:.3f} ({result['elapsed_ms']}ms)")
+        rule_met = evaluate_policy(policy, results)
+        if rule_met:
+            break
+
+    # 남은 호출 취소
+    cancelled = sorted(tasks[task] for task in pending)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    reason = "Cancelled" if rule_met else "Timeout"
+    for engine in cancelled:
+        results[engine] = {"success": False, "error": reason, "score": 0.0}
+
+    successful = [engine for engine, result in results.items() if result.get("success")]
+    best_engine = max(successful, key=lambda engine: results[engine]["score"]) if successful else None
+
+    return {
+        "success": bool(successful),
+        "best_engine": best_engine,
+        "results": results,
+        "policy": {
+            **policy,
+            "rule_met": rule_met,
+            "stopped_early": bool(rule_met) and bool(cancelled),
+            "cancelled": cancelled,
+            "elapsed_ms": round((loop.time() - start) * 1000, 1),
+        },
+    }
+
+
+# ===============================================
+# HTTP 엔드포인트
+# ===============================================
+
+def decode_base64_image(image_base64):
+    """Base64 이미지 디코딩 (data:...;base64, prefix 허용) - 형식이 잘못되면 ValueError"""
+    if not isinstance(image_base64, str):
+        raise ValueError("image_base64 must be a string")
+    if ',' in image_base64:
+        image_base64 = image_base64.split(',', 1)[1]
+    try:
+        image = base64.b64decode(image_base64, validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"Invalid image_base64: {e}")
+    if not image:
+        raise ValueError("image_base64 is empty")
+    return image
+
+
+async def read_image(request):
+    """
+    multipart(image_file 또는 첫 번째 파일 필드) 또는 JSON(image_base64)에서 이미지 추출
+    JSON 에 이미지 참조(image_shm, image_path)가 있으면 읽지 않고 참조 dict 를 그대로 반환
+    (엔진들이 같은 공유 볼륨/세그먼트를 각자 매핑하므로 엔진 수만큼의 업로드 복사가 없어짐,
+    image_base64 가 함께 오면 엔진의 fallback 업로드로 같이 전달)
+    """
+    if request.content_type == 'application/json':
+        data = await request.json()
+        if data is None:
+            return None
+        if not isinstance(data, dict):
+            raise ValueError("JSON body must be an object")
+        if 'image_shm' in data or 'image_path' in data:
+            if 'image_base64' in data:
+                decode_base64_image(data['image_base64'])
+            return {key: data[key] for key in IMAGE_REF_KEYS + ('image_base64',) if key in data}
+        if not data.get('image_base64'):
+            return None
+        return decode_base64_image(data['image_base64'])
+
+    if request.content_type.startswith('multipart/'):
+        form = await request.post()
+        field = form.get('image_file')
+        if field is None:
+            field = next((value for value in form.values() if hasattr(value, 'file')), None)
+        if field is not None and hasattr(field, 'file'):
+            return field.file.read()
+    return None
+
+
+async def ensemble_endpoint(request):
+    """
+    앙상블 OCR 엔드포인트
+
+    Query (선택):
+    - policy: quality | agreement | quality_or_agreement | all
+    - min_score, agreement_threshold, agreement_min_engines, timeout, hedge_delay
+
+    Response:
+    - success: 하나 이상의 엔진 성공 여부
+    - best_engine: 점수가 가장 높은 엔진
+    - results: 엔진별 결과 (score, replica, hedged, elapsed_ms 포함)
+    - policy: 적용된 정책과 종료 사유(rule_met), 취소된 엔진 목록
+    """
+    try:
+        policy = resolve_policy(request.query)
+        image = await read_image(request)
+    except ValueError as e:
+        return web.json_response({"success": False, "error": str(e)}, status=400, dumps=dumps)
+
+    if image is None:
+        return web.json_response({
+            "success": False,
+            "error": "Missing image data. Use 'image_file' (multipart) or 'image_base64' (JSON)"
+        }, status=400, dumps=dumps)
+
+    logger.info(f"=== 앙상블 OCR 시작 (policy={policy['name']}) ===")
+    result = await run_ensemble(request.app['session'], image, policy)
+    logger.info(f"=== 앙상블 OCR 완료 ({result['policy']['elapsed_ms']}ms, "
+                f"rule_met={result['policy']['rule_met']}, cancelled={result['policy']['cancelled']}) ===")
+    return web.json_response(result, dumps=dumps)
+
+
+async def health(request):
+    """헬스체크 엔드포인트"""
+    return web.json_response({
+        "status": "healthy",
+        "engine": "ensemble-gateway",
+        "engines": ENGINES,
+        "policy": DEFAULT_POLICY,
+    }, dumps=dumps)
+
+
+async def client_session(app):
+    """keep-alive 커넥션 풀을 공유하는 HTTP 세션 (앱 수명과 동일)"""
+    connector = aiohttp.TCPConnector(limit_per_host=POOL_SIZE, keepalive_timeout=KEEPALIVE_SECONDS)
+    app['session'] = aiohttp.ClientSession(connector=connector)
+    yield
+    await app['session'].close()
+
+
+def create_app():
+    app = web.Application(client_max_size=32 * 1024 * 1024)
+    app.cleanup_ctx.append(client_session)
+    app.router.add_get('/health', health)
+    app.router.add_post('/ensemble', ensemble_endpoint)
+    return app
+
+
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 9010))
+    logger.info(f"Starting ensemble gateway on port {port}...")
+    logger.info(f"Engines: {ENGINES}")
+    web.run_app(create_app(), host='0.0.0.0', port=port)
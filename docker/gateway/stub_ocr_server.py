@@ -0,0 +1,60 @@
+"""
+스텁 OCR 서버 (로컬 개발/테스트용)
+실제 모델 없이 OCR 서버의 /ocr, /health 응답 형식을 흉내냄
+
+사용 예:
+    python stub_ocr_server.py --port 9103 --delay 0.5 --text "사업자등록증
+    등록번호 : 123-45-67890"
+    PADDLEOCR_URLS=http://localhost:9103 python ensemble_gateway.py
+"""
+
+import argparse
+import asyncio
+
+from aiohttp import web
+
+from ocr_quality import estimate_ocr_success
+
+DEFAULT_TEXT = "사업자등록증\n(일반과세자)\n등록번호 : 123-45-67890\n상호 : 테스트상사\n대표자 : 홍길동"
+
+
+def create_app(text, delay, confidence, fail, engine):
+    async def ocr(request):
+        await request.read()
+        await asyncio.sleep(delay)
+        if fail:
+            return web.json_response({"success": False, "error": "Stub failure"}, status=500)
+
+        lines = [{"text": line, "confidence": confidence} for line in text.split('\n') if line.strip()]
+        success_rate, level, details = estimate_ocr_success(lines, text)
+        return web.json_response({
+            "success": True,
+            "text": text,
+            "lines": lines,
+            "line_count": len(lines),
+            "ocr_quality": {"success_rate": round(success_rate, 3), "level": level, "details": details},
+            "engine": engine,
+        })
+
+    async def health(request):
+        return web.json_response({"status": "healthy", "engine": engine})
+
+    app = web.Application()
+    app.router.add_post('/ocr', ocr)
+    app.router.add_get('/health', health)
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Stub OCR server")
+    parser.add_argument('--port', type=int, default=9103)
+    parser.add_argument('--delay', type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument('--text', default=DEFAULT_TEXT)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--fail', action='store_true', help="항상 500 응답")
+    parser.add_argument('--engine', default="stub")
+    args = parser.parse_args()
+    web.run_app(
+        create_app(args.text, args.delay, args.confidence, args.fail, args.engine),
+        host='0.0.0.0', port=args.port
+    )
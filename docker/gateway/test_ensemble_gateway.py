@@ -0,0 +1,117 @@
+"""
+앙상블 게이트웨이 테스트 (stub_ocr_server 를 엔진 대신 사용)
+
+실행:
+    python -m pytest docker/gateway
+"""
+
+import asyncio
+import base64
+import os
+import sys
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+
+import ensemble_gateway  # noqa: E402
+import stub_ocr_server  # noqa: E402
+
+IMAGE = {"image_base64": base64.b64encode(b"fake-image").decode()}
+
+
+def stub(delay=0.0, fail=False, engine="stub"):
+    app = stub_ocr_server.create_app(stub_ocr_server.DEFAULT_TEXT, delay, 0.95, fail, engine)
+    return TestServer(app)
+
+
+async def call_gateway(engines, query, body=IMAGE):
+    """stub 서버들을 띄우고 ENGINES 를 stub 주소로 바꾼 뒤 /ensemble 호출 (상태 코드, 응답, 엔진 주소)"""
+    servers = [server for urls in engines.values() for server in urls]
+    for server in servers:
+        await server.start_server()
+    original = ensemble_gateway.ENGINES
+    urls = {
+        engine: [str(server.make_url('')).rstrip('/') for server in replicas]
+        for engine, replicas in engines.items()
+    }
+    ensemble_gateway.ENGINES = urls
+    client = TestClient(TestServer(ensemble_gateway.create_app()))
+    try:
+        await client.start_server()
+        response = await client.post('/ensemble', params=query, json=body)
+        return response.status, await response.json(), urls
+    finally:
+        ensemble_gateway.ENGINES = original
+        await client.close()
+        for server in servers:
+            await server.close()
+
+
+def test_quality_early_stop_cancels_slow_engines():
+    status, result, _ = asyncio.run(call_gateway(
+        {"paddleocr": [stub()], "pororo": [stub(delay=5)], "easyocr": [stub(delay=5)]},
+        {"policy": "quality", "min_score": "0.1", "hedge_delay": "0"},
+    ))
+
+    assert status == 200
+    assert result["best_engine"] == "paddleocr"
+    assert result["policy"]["rule_met"].startswith("quality: paddleocr")
+    assert result["policy"]["stopped_early"] is True
+    assert result["policy"]["cancelled"] == ["easyocr", "pororo"]
+    assert result["results"]["pororo"]["error"] == "Cancelled"
+    assert result["policy"]["elapsed_ms"] < 5000
+
+
+def test_slow_replica_is_hedged_to_second_replica():
+    status, result, urls = asyncio.run(call_gateway(
+        {"paddleocr": [stub(delay=5), stub()]},
+        {"policy": "all", "hedge_delay": "0.2"},
+    ))
+
+    assert status == 200
+    paddle = result["results"]["paddleocr"]
+    assert paddle["success"] is True
+    assert paddle["hedged"] is True
+    assert paddle["replica"] == urls["paddleocr"][1]
+
+
+def test_timeout_is_reported_for_unfinished_engines():
+    status, result, _ = asyncio.run(call_gateway(
+        {"paddleocr": [stub()], "pororo": [stub(delay=5)]},
+        {"policy": "all", "timeout": "0.5", "hedge_delay": "0"},
+    ))
+
+    assert status == 200
+    assert result["success"] is True
+    assert result["policy"]["rule_met"] is None
+    assert result["policy"]["cancelled"] == ["pororo"]
+    assert result["results"]["pororo"] == {"success": False, "error": "Timeout", "score": 0.0}
+
+
+@pytest.mark.parametrize("body", [
+    {"image_base64": 123},
+    {"image_base64": "not base64!"},
+    {"image_base64": "data:image/png;base64,"},
+    ["image_base64"],
+])
+def test_invalid_image_base64_is_rejected(body):
+    status, result, _ = asyncio.run(call_gateway({"paddleocr": [stub()]}, {}, body))
+
+    assert status == 400
+    assert result["success"] is False
+
+
+@pytest.mark.parametrize("query", [
+    {"timeout": "nan"},
+    {"timeout": "inf"},
+    {"timeout": "-1"},
+    {"hedge_delay": "nan"},
+    {"min_score": "-0.5"},
+])
+def test_non_finite_or_negative_policy_values_are_rejected(query):
+    status, result, _ = asyncio.run(call_gateway({"paddleocr": [stub()]}, query))
+
+    assert status == 400
+    assert result["success"] is False
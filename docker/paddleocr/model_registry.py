@@ -0,0 +1,319 @@
+"""
+RapidOCR 모델 레지스트리 (무중단 모델 교체)
+
+- 활성 모델 세트(검출 모델 + 인식 모델 + 사전)를 요청 단위로 참조 카운트하며 제공
+- 후보 모델 세트를 백그라운드에서 로드/워밍업한 뒤 원자적으로 교체
+- 교체 후 처리 중인 요청은 기존 세션으로 끝나고, 요청이 모두 끝나면 기존 세션 해제
+- shadow 모드: 후보 모델을 교체하지 않고 일정 비율의 트래픽을 복제 실행해 지연시간/품질 점수 비교
+"""
+
+import contextlib
+import gc
+import glob
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from rapidocr_onnxruntime import RapidOCR
+
+# 워밍업 이미지 디렉토리 (없으면 합성 이미지 사용)
+WARMUP_DIR = os.environ.get("WARMUP_DIR", "/app/warmup")
+WARMUP_ROUNDS = int(os.environ.get("WARMUP_ROUNDS", 2))
+
+# 교체된 모델의 처리 중 요청 대기 시간 (초)
+DRAIN_TIMEOUT = float(os.environ.get("MODEL_DRAIN_TIMEOUT", 300))
+
+# 대기/실행 중일 수 있는 shadow 작업 수 (초과 시 건너뜀 - 이미지 사본이 큐에 쌓이지 않도록)
+SHADOW_MAX_PENDING = max(int(os.environ.get("SHADOW_MAX_PENDING", 1)), 1)
+
+
+class ModelSet:
+    """로드된 RapidOCR 모델 세트와 처리 중 요청 수"""
+
+    def __init__(self, det_model, rec_model, rec_keys):
+        self.det_model = det_model
+        self.rec_model = rec_model
+        self.rec_keys = rec_keys
+        self.version = (f"{os.path.basename(rec_model)}+{os.path.basename(rec_keys)}"
+                        if rec_model else "default")
+        self.loaded_at = None
+        self.ocr = None
+        self._in_flight = 0
+        self._idle = threading.Condition()
+
+    def load(self):
+        if self.rec_model:
+            self.ocr = RapidOCR(
+                det_model_path=self.det_model,
+                rec_model_path=self.rec_model,
+                rec_keys_path=self.rec_keys
+            )
+        else:
+            self.ocr = RapidOCR()
+        self.loaded_at = time.time()
+        return self
+
+    def acquire(self):
+        with self._idle:
+            self._in_flight += 1
+
+    def release(self):
+        with self._idle:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle.notify_all()
+
+    def wait_idle(self, timeout):
+        with self._idle:
+            return self._idle.wait_for(lambda: self._in_flight == 0, timeout=timeout)
+
+    def close(self):
+        """ONNX 세션 참조 해제"""
+        self.ocr = None
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "det_model": self.det_model,
+            "rec_model": self.rec_model,
+            "rec_keys": self.rec_keys,
+            "loaded_at": self.loaded_at,
+            "in_flight": self._in_flight,
+        }
+
+
+def _warmup_images():
+    """워밍업용 이미지 바이트 목록 (WARMUP_DIR 이미지 또는 합성 이미지)"""
+    paths = sorted(
+        path for pattern in ("*.png", "*.jpg", "*.jpeg")
+        for path in glob.glob(os.path.join(WARMUP_DIR, pattern))
+    )
+    images = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            images.append(f.read())
+    if images:
+        return images
+
+    canvas = np.full((200, 800, 3), 255, dtype=np.uint8)
+    cv2.putText(canvas, "123-45-67891 WARMUP", (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 1.6, (0, 0, 0), 3)
+    _, encoded = cv2.imencode('.png', canvas)
+    return [encoded.tobytes()]
+
+
+class ModelRegistry:
+    """활성/후보 모델 세트 관리"""
+
+    def __init__(self, score_fn):
+        # score_fn(ocr_result) -> 품질 점수 (shadow 비교용)
+        self._score_fn = score_fn
+        self._lock = threading.Lock()
+        self._active = None
+        self._candidate = None
+        self._shadow_percent = 0.0
+        self._shadow_stats = None
+        self._shadow_pending = 0
+        self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-shadow")
+        self._status = {"state": "idle"}
+
+    # ===============================================
+    # 활성 모델
+    # ===============================================
+
+    def load_initial(self, det_model, rec_model, rec_keys):
+        self._active = ModelSet(det_model, rec_model, rec_keys).load()
+        return self._active
+
+    @contextlib.contextmanager
+    def acquire(self):
+        """요청 처리 동안 활성 모델 세트를 고정 (교체되어도 이 요청은 기존 세션 사용)"""
+        with self._lock:
+            model = self._active
+            model.acquire()
+        try:
+            yield model
+        finally:
+            model.release()
+
+    @property
+    def active(self):
+        return self._active
+
+    # ===============================================
+    # 후보 모델 로드 / 교체
+    # ===============================================
+
+    def start_candidate(self, det_model, rec_model, rec_keys, mode="swap", shadow_percent=0.0):
+        """
+        후보 모델을 백그라운드에서 로드
+        - mode=swap: 워밍업 후 즉시 교체 (shadow 중인 후보가 있으면 함께 폐기)
+        - mode=shadow: 워밍업 후 shadow_percent 비율의 요청을 복제 실행 (promote 호출 시 교체)
+        """
+        with self._lock:
+            if self._status["state"] == "loading":
+                raise RuntimeError("Another model set is already loading")
+            self._status = {"state": "loading", "mode": mode, "rec_model": rec_model,
+                            "rec_keys": rec_keys, "started_at": time.time()}
+
+        thread = threading.Thread(
+            target=self._load_candidate,
+            args=(det_model, rec_model, rec_keys, mode, shadow_percent),
+            name="ocr-model-loader",
+            daemon=True
+        )
+        thread.start()
+
+    def _load_candidate(self, det_model, rec_model, rec_keys, mode, shadow_percent):
+        try:
+            print(f"[ModelRegistry] Loading candidate: {rec_model} / {rec_keys}")
+            candidate = ModelSet(det_model, rec_model, rec_keys).load()
+
+            warmup_start = time.perf_counter()
+            images = _warmup_images()
+            for _ in range(WARMUP_ROUNDS):
+                for image_bytes in images:
+                    candidate.ocr(image_bytes)
+            warmup_ms = round((time.perf_counter() - warmup_start) * 1000, 1)
+            print(f"[ModelRegistry] Candidate warmed up ({len(images)} images x {WARMUP_ROUNDS}, {warmup_ms}ms)")
+
+            if mode == "shadow":
+                with self._lock:
+                    previous, self._candidate = self._candidate, candidate
+                    self._shadow_percent = shadow_percent
+                    self._shadow_stats = {"samples": 0, "active_ms": 0.0, "candidate_ms": 0.0,
+                                          "active_score": 0.0, "candidate_score": 0.0, "errors": 0,
+                                          "skipped": 0}
+                    self._status = {"state": "shadow", "version": candidate.version,
+                                    "warmup_ms": warmup_ms, "shadow_percent": shadow_percent}
+                if previous is not None:
+                    self._retire(previous)
+            else:
+                self._swap(candidate)
+                with self._lock:
+                    self._status = {"state": "swapped", "version": candidate.version, "warmup_ms": warmup_ms}
+        except Exception as e:
+            print(f"[ModelRegistry] Candidate load failed: {e}")
+            with self._lock:
+                self._status = {"state": "failed", "error": str(e)}
+
+    def _swap(self, candidate):
+        with self._lock:
+            previous, self._active = self._active, candidate
+            # 이전 활성 모델과 비교하던 shadow 후보는 교체 후 의미가 없고,
+            # 남겨 두면 promote 시 방금 교체한 모델을 덮어쓰므로 함께 폐기
+            stale = self._candidate if self._candidate is not candidate else None
+            self._candidate = None
+            self._shadow_percent = 0.0
+            self._shadow_stats = None
+        print(f"[ModelRegistry] Active model swapped: {previous.version} -> {candidate.version}")
+        self._retire(previous)
+        if stale is not None:
+            print(f"[ModelRegistry] Shadow candidate {stale.version} discarded by swap")
+            self._retire(stale)
+
+    def _retire(self, model):
+        """처리 중인 요청이 모두 끝나면 세션 해제 (백그라운드)"""
+
+        def drain():
+            drained = model.wait_idle(DRAIN_TIMEOUT)
+            model.close()
+            gc.collect()
+            print(f"[ModelRegistry] Released model {model.version} (drained={drained})")
+
+        threading.Thread(target=drain, name="ocr-model-drain", daemon=True).start()
+
+    def promote(self):
+        """shadow 중인 후보 모델을 활성 모델로 교체"""
+        with self._lock:
+            candidate, self._candidate = self._candidate, None
+            self._shadow_percent = 0.0
+        if candidate is None:
+            raise RuntimeError("No shadow candidate to promote")
+        self._swap(candidate)
+        with self._lock:
+            self._status = {"state": "swapped", "version": candidate.version}
+        return candidate
+
+    def discard(self):
+        """shadow 중인 후보 모델 폐기"""
+        with self._lock:
+            candidate, self._candidate = self._candidate, None
+            self._shadow_percent = 0.0
+            self._status = {"state": "idle"}
+        if candidate is not None:
+            self._retire(candidate)
+        return candidate
+
+    # ===============================================
+    # shadow 트래픽
+    # ===============================================
+
+    def maybe_shadow(self, processed_bytes, active_ms, active_score):
+        """
+        shadow 비율에 해당하면 후보 모델로 같은 이미지를 비동기 실행 (응답에는 영향 없음)
+        이미 SHADOW_MAX_PENDING 개의 작업이 대기/실행 중이면 건너뛰고 skipped 로 집계
+        (후보 모델이 트래픽보다 느려도 메모리/CPU 사용이 늘지 않음)
+        """
+        with self._lock:
+            candidate = self._candidate
+            if candidate is None or random.random() * 100 >= self._shadow_percent:
+                return
+            if self._shadow_pending >= SHADOW_MAX_PENDING:
+                if self._shadow_stats is not None:
+                    self._shadow_stats["skipped"] += 1
+                return
+            self._shadow_pending += 1
+            candidate.acquire()
+        self._shadow_executor.submit(self._run_shadow, candidate, processed_bytes, active_ms, active_score)
+
+    def _run_shadow(self, candidate, processed_bytes, active_ms, active_score):
+        try:
+            start = time.perf_counter()
+            result, _ = candidate.ocr(processed_bytes)
+            candidate_ms = (time.perf_counter() - start) * 1000
+            candidate_score = self._score_fn(result)
+            with self._lock:
+                stats = self._shadow_stats
+                if stats is None or candidate is not self._candidate:
+                    return
+                stats["samples"] += 1
+                stats["active_ms"] += active_ms
+                stats["candidate_ms"] += candidate_ms
+                stats["active_score"] += active_score
+                stats["candidate_score"] += candidate_score
+        except Exception as e:
+            print(f"[ModelRegistry] Shadow run failed: {e}")
+            with self._lock:
+                if self._shadow_stats is not None:
+                    self._shadow_stats["errors"] += 1
+        finally:
+            with self._lock:
+                self._shadow_pending -= 1
+            candidate.release()
+
+    def describe(self):
+        with self._lock:
+            shadow = None
+            if self._candidate is not None and self._shadow_stats is not None:
+                stats = self._shadow_stats
+                samples = max(stats["samples"], 1)
+                shadow = {
+                    "candidate": self._candidate.describe(),
+                    "shadow_percent": self._shadow_percent,
+                    "samples": stats["samples"],
+                    "errors": stats["errors"],
+                    "skipped": stats["skipped"],
+                    "avg_active_ms": round(stats["active_ms"] / samples, 1),
+                    "avg_candidate_ms": round(stats["candidate_ms"] / samples, 1),
+                    "avg_active_score": round(stats["active_score"] / samples, 3),
+                    "avg_candidate_score": round(stats["candidate_score"] / samples, 3),
+                }
+            return {
+                "active": self._active.describe() if self._active else None,
+                "status": dict(self._status),
+                "shadow": shadow,
+            }
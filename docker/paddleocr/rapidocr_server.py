@@ -9,17 +9,27 @@ RapidOCR: https://github.com/RapidAI/RapidOCR
 - Dictionary: ppocr_v5_korean_dict.txt (47KB, 모델과 매칭)
 """
 
-import base64
 import io
+import math
 import os
+import time
 import cv2
 import numpy as np
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from rapidocr_onnxruntime import RapidOCR
+
+from admin_guard import require_admin_token
+from document_pages import DocumentError, is_multipage_document, page_stream_response, process_document
+from field_extraction import extract_business_license_fields, merge_spaced_korean_words
+from model_registry import ModelRegistry
+from ocr_input import ImageRefError, read_image_bytes
+from ocr_quality import estimate_ocr_success
+from ocr_response import box_to_rect, render
+from profiler import debug_blueprint
 
 app = Flask(__name__)
 CORS(app)
+app.register_blueprint(debug_blueprint)
 
 # 한국어 모델 경로 설정 (PP-OCRv5 최신)
 MODEL_DIR = "/app/models"
@@ -33,40 +43,37 @@ print(f"  Detection model: {DET_MODEL}")
 print(f"  Recognition model: {REC_MODEL}")
 print(f"  Dictionary: {REC_KEYS}")
 
+
+def score_ocr_result(result):
+    """RapidOCR 원본 결과의 품질 점수 (shadow 비교용)"""
+    lines, _, full_text_parts = build_lines(result)
+    success_rate, _, _ = estimate_ocr_success(lines, "\n".join(full_text_parts))
+    return success_rate
+
+
+# 모델 레지스트리 (/admin/models 로 무중단 교체 가능)
+model_registry = ModelRegistry(score_fn=score_ocr_result)
+
 # 모델 파일 존재 여부 확인
 if os.path.exists(REC_MODEL) and os.path.exists(REC_KEYS):
     print("Korean models found, using custom configuration...")
-    ocr = RapidOCR(
-        det_model_path=DET_MODEL if os.path.exists(DET_MODEL) else None,
-        rec_model_path=REC_MODEL,
-        rec_keys_path=REC_KEYS
+    model_registry.load_initial(
+        DET_MODEL if os.path.exists(DET_MODEL) else None,
+        REC_MODEL,
+        REC_KEYS
     )
 else:
     print("Korean models not found, using default models...")
-    ocr = RapidOCR()
+    model_registry.load_initial(None, None, None)
 
 print("RapidOCR initialized successfully!")
 
 
-def merge_spaced_korean_words(text):
-    """
-    공백으로 분리된 한글 단어 결합 (Text Chunking)
-    예: "도 소 매" -> "도소매"
-    """
-    import re
-    
-    # 한글 문자 사이의 단일 공백 제거 (한글+공백+한글 패턴)
-    # 예: "도 소 매" -> "도소매"
-    pattern = r'([\uac00-\ud7a3])\s+(?=[\uac00-\ud7a3])'
-    result = re.sub(pattern, r'\1', text)
-    
-    return result
-
-
 def merge_lines_by_y_coordinate(ocr_result):
     """
     Y 좌표 기반으로 같은 줄의 텍스트를 병합
     RapidOCR 결과에서 boxes를 활용하여 줄 단위로 결합
+    각 줄의 'box'는 병합된 박스들을 감싸는 [x_min, y_min, x_max, y_max]
     """
     if not ocr_result:
         return []
@@ -103,19 +110,22 @@ def merge_lines_by_y_coordinate(ocr_result):
             current_line = {
                 'y': item['y'],
                 'texts': [(item['x'], item['text'])],
-                'confidences': [item['confidence']]
+                'confidences': [item['confidence']],
+                'rects': [box_to_rect(item['box'])]
             }
         elif abs(item['y'] - current_line['y']) <= y_threshold:
             # 같은 줄에 추가
             current_line['texts'].append((item['x'], item['text']))
             current_line['confidences'].append(item['confidence'])
+            current_line['rects'].append(box_to_rect(item['box']))
         else:
             # 새 줄 시작
             merged_lines.append(current_line)
             current_line = {
                 'y': item['y'],
                 'texts': [(item['x'], item['text'])],
-                'confidences': [item['confidence']]
+                'confidences': [item['confidence']],
+                'rects': [box_to_rect(item['box'])]
             }
     
     if current_line:
@@ -133,9 +143,14 @@ def merge_lines_by_y_coordinate(ocr_result):
         
         avg_confidence = sum(line['confidences']) / len(line['confidences'])
         
+        rects = line['rects']
         result.append({
             'text': merged_text,
-            'confidence': avg_confidence
+            'confidence': avg_confidence,
+            'box': [
+                min(r[0] for r in rects), min(r[1] for r in rects),
+                max(r[2] for r in rects), max(r[3] for r in rects)
+            ]
         })
     
     return result
@@ -182,79 +197,113 @@ def preprocess_image(image_bytes):
     return encoded.tobytes()
 
 
-def estimate_ocr_success(lines, full_text):
-    """
-    OCR 성공률 추정
-    - 한글 비율: 사업자등록증은 한글이 많아야 함
-    - 평균 신뢰도: RapidOCR의 confidence 점수
-    - 의미 있는 단어 비율: 알려진 키워드 매칭
-    """
-    if not lines or not full_text:
-        return 0.0, "NO_TEXT"
-    
-    # 1. 한글 비율 계산
-    korean_chars = sum(1 for c in full_text if '\uac00' <= c <= '\ud7a3')
-    total_chars = len(full_text.replace('\n', '').replace(' ', ''))
-    korean_ratio = korean_chars / max(total_chars, 1)
-    
-    # 2. 평균 신뢰도
-    avg_confidence = sum(line['confidence'] for line in lines) / max(len(lines), 1)
-    
-    # 3. 키워드 매칭
-    keywords = ['국세청', '사업자', '등록', '번호', '대표자', '법인', '개업', 
-                '소재지', '업태', '종목', '제조', '도소매', '전화', '세무서']
-    matched_keywords = sum(1 for kw in keywords if kw in full_text)
-    keyword_score = min(matched_keywords / 10, 1.0)  # 최대 1.0
-    
-    # 4. 비정상 문자 패턴 (연속 영문 대문자 = 깨진 문자일 가능성)
-    import re
-    gibberish_patterns = re.findall(r'[A-Z]{3,}', full_text)
-    gibberish_penalty = min(len(gibberish_patterns) * 0.1, 0.5)
-    
-    # 5. 종합 점수 계산
-    # 한글 비율(40%) + 신뢰도(30%) + 키워드(30%) - 깨진 문자 페널티
-    success_rate = (korean_ratio * 0.4 + avg_confidence * 0.3 + keyword_score * 0.3) - gibberish_penalty
-    success_rate = max(0.0, min(1.0, success_rate))
-    
-    # 레벨 결정
-    if success_rate >= 0.8:
-        level = "EXCELLENT"
-    elif success_rate >= 0.6:
-        level = "GOOD"
-    elif success_rate >= 0.4:
-        level = "FAIR"
-    elif success_rate >= 0.2:
-        level = "POOR"
-    else:
-        level = "VERY_POOR"
-    
-    return success_rate, level, {
-        "korean_ratio": round(korean_ratio, 3),
-        "avg_confidence": round(avg_confidence, 3),
-        "keyword_score": round(keyword_score, 3),
-        "gibberish_penalty": round(gibberish_penalty, 3),
-        "matched_keywords": matched_keywords
-    }
-
-
 @app.route('/health', methods=['GET'])
 def health():
     """헬스체크 엔드포인트"""
+    active = model_registry.active
     return jsonify({
         "status": "healthy", 
         "engine": "RapidOCR",
-        "language": "korean (PP-OCRv5)" if os.path.exists(REC_MODEL) else "default"
+        "language": "korean" if active.rec_model else "default",
+        "model": active.version
     })
 
 
-def process_ocr(image_bytes):
-    """OCR 처리 공통 함수"""
-    # 가벼운 이미지 전처리 (CLAHE 대비 향상 + 업스케일만)
-    processed_bytes = preprocess_image(image_bytes)
-    
-    result, elapsed = ocr(processed_bytes)
-    
+def resolve_model_path(name):
+    """MODEL_DIR 내부 파일만 허용 (파일명 또는 MODEL_DIR 기준 상대 경로)"""
+    if not name:
+        return None
+    if not isinstance(name, str):
+        raise ValueError(f"Model path must be a string: {name!r}")
+    path = os.path.realpath(os.path.join(MODEL_DIR, name))
+    if not path.startswith(os.path.realpath(MODEL_DIR) + os.sep):
+        raise ValueError(f"Model path must be inside {MODEL_DIR}: {name}")
+    if not os.path.exists(path):
+        raise ValueError(f"Model file not found: {name}")
+    return path
+
+
+def parse_shadow_percent(value):
+    """shadow 복제 비율 (0~100 으로 제한, NaN 은 비교가 항상 거짓이라 모든 요청이 복제되므로 거부)"""
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        percent = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"shadow_percent must be a number: {value!r}")
+    if not math.isfinite(percent):
+        raise ValueError(f"shadow_percent must be a finite number: {value!r}")
+    return min(max(percent, 0.0), 100.0)
+
+
+@app.route('/admin/models', methods=['GET'])
+@require_admin_token
+def admin_models_status():
+    """활성 모델, 후보 모델 로드 상태, shadow 비교 결과 조회"""
+    return jsonify({"success": True, **model_registry.describe()})
+
+
+@app.route('/admin/models', methods=['POST'])
+@require_admin_token
+def admin_models_load():
+    """
+    새 모델 세트 로드 (백그라운드)
+    
+    Request Body (JSON, 경로는 MODEL_DIR 기준):
+    - det_model: 검출 모델 (생략 시 현재 모델 유지)
+    - rec_model: 인식 모델 (생략 시 현재 모델 유지)
+    - rec_keys: 사전 파일 (생략 시 현재 사전 유지)
+    - mode: swap (워밍업 후 즉시 교체, 기본값) | shadow (트래픽 일부만 복제 실행)
+    - shadow_percent: shadow 모드에서 복제할 요청 비율 (0~100)
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "JSON body must be an object"}), 400
+    active = model_registry.active
+    mode = data.get('mode', 'swap')
+    try:
+        if mode not in ('swap', 'shadow'):
+            raise ValueError("mode must be 'swap' or 'shadow'")
+        shadow_percent = parse_shadow_percent(data.get('shadow_percent', 10))
+        det_model = resolve_model_path(data['det_model']) if data.get('det_model') else active.det_model
+        rec_model = resolve_model_path(data['rec_model']) if data.get('rec_model') else active.rec_model
+        rec_keys = resolve_model_path(data['rec_keys']) if data.get('rec_keys') else active.rec_keys
+        if not rec_model or not rec_keys:
+            raise ValueError("rec_model and rec_keys are required when the default model is active")
+        model_registry.start_candidate(det_model, rec_model, rec_keys, mode, shadow_percent)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"success": False, "error": str(e)}), 409
+    return jsonify({"success": True, **model_registry.describe()}), 202
+
+
+@app.route('/admin/models/promote', methods=['POST'])
+@require_admin_token
+def admin_models_promote():
+    """shadow 중인 후보 모델을 활성 모델로 교체"""
+    try:
+        model_registry.promote()
+    except RuntimeError as e:
+        return jsonify({"success": False, "error": str(e)}), 409
+    return jsonify({"success": True, **model_registry.describe()})
+
+
+@app.route('/admin/models/candidate', methods=['DELETE'])
+@require_admin_token
+def admin_models_discard():
+    """shadow 중인 후보 모델 폐기"""
+    model_registry.discard()
+    return jsonify({"success": True, **model_registry.describe()})
+
+
+def build_lines(result):
+    """
+    RapidOCR 원본 결과 -> (라인 목록, 라인별 박스, 라인 텍스트 목록)
+    좌표 기반 라인 병합을 우선 적용하고 실패 시 항목 단위로 처리
+    """
     lines = []
+    boxes = []
     full_text_parts = []
     
     if result:
@@ -262,7 +311,8 @@ def process_ocr(image_bytes):
         try:
             merged = merge_lines_by_y_coordinate(result)
             if merged:
-                lines = merged
+                lines = [{'text': line['text'], 'confidence': line['confidence']} for line in merged]
+                boxes = [line['box'] for line in merged]
                 full_text_parts = [line['text'] for line in merged]
                 print(f"  Text chunking applied: {len(result)} items -> {len(merged)} lines")
             else:
@@ -270,6 +320,9 @@ def process_ocr(image_bytes):
         except Exception as e:
             print(f"  Text chunking fallback: {e}")
             # 기존 방식으로 fallback
+            lines = []
+            boxes = []
+            full_text_parts = []
             for line in result:
                 text = line[1]
                 confidence = float(line[2]) if len(line) > 2 else 0.9
@@ -279,13 +332,41 @@ def process_ocr(image_bytes):
                     "text": text,
                     "confidence": confidence
                 })
+                boxes.append(box_to_rect(line[0]))
                 full_text_parts.append(text)
     
+    return lines, boxes, full_text_parts
+
+
+def process_ocr(image_bytes):
+    """
+    OCR 처리 공통 함수
+    
+    Returns:
+        (응답 dict, 라인별 박스 [x_min, y_min, x_max, y_max] 목록)
+    """
+    # 가벼운 이미지 전처리 (CLAHE 대비 향상 + 업스케일만)
+    processed_bytes = preprocess_image(image_bytes)
+    
+    # 요청 처리 동안 활성 모델 고정 (처리 중 교체되어도 기존 세션으로 완료)
+    with model_registry.acquire() as model:
+        start = time.perf_counter()
+        result, elapsed = model.ocr(processed_bytes)
+        ocr_ms = (time.perf_counter() - start) * 1000
+    
+    lines, boxes, full_text_parts = build_lines(result)
+    
     full_text = "\n".join(full_text_parts)
     
     # OCR 성공률 추정
     success_rate, level, details = estimate_ocr_success(lines, full_text)
     
+    # 규칙 기반 필드 추출 (필수 필드 검증 통과 시 Worker가 LLM 생략)
+    extraction = extract_business_license_fields(lines)
+    
+    # shadow 후보 모델이 있으면 일부 요청을 복제 실행 (응답에는 영향 없음)
+    model_registry.maybe_shadow(processed_bytes, ocr_ms, success_rate)
+    
     # 로깅
     print(f"=== OCR Result ===")
     print(f"  Full Text Preview:\n{full_text}")
@@ -297,6 +378,8 @@ def process_ocr(image_bytes):
           f"keywords={details['matched_keywords']}/14")
     if details['gibberish_penalty'] > 0:
         print(f"  Warning: Detected {int(details['gibberish_penalty']*10)} gibberish patterns")
+    print(f"  Field extraction: complete={extraction['complete']}, "
+          f"missing={extraction['missing']} ({extraction['elapsed_ms']}ms)")
     print(f"==================")
     
     # elapsed가 리스트인 경우 처리
@@ -304,23 +387,27 @@ def process_ocr(image_bytes):
     if isinstance(elapsed, (list, tuple)):
         elapsed_value = sum(elapsed) if elapsed else 0.0
     
-    return {
+    response = {
         "success": True,
         "text": full_text,
         "lines": lines,
         "line_count": len(lines),
         "elapsed_time": elapsed_value,
+        "model": model.version,
         # OCR 품질 추정
         "ocr_quality": {
             "success_rate": round(success_rate, 3),
             "level": level,
             "details": details
         },
+        # 규칙 기반 필드 추출 결과
+        "extraction": extraction,
         # 호환성을 위한 추가 필드
         "code": "100",
         "msg": "success",
         "data": [{"text": line["text"], "score": line["confidence"]} for line in lines]
     }
+    return response, boxes
 
 
 @app.route('/ocr', methods=['POST'])
@@ -331,6 +418,10 @@ def ocr_endpoint():
     지원 형식:
     1. Multipart form-data: 'image_file' 필드로 이미지 파일 업로드
     2. JSON: 'image_base64' 필드로 Base64 인코딩된 이미지
+    3. 같은 호스트: 'image_shm'(공유 메모리) 또는 'image_path'(공유 볼륨) 참조 (ocr_input 모듈 참고)
+       매핑할 수 없고 업로드도 없으면 422 → 일반 업로드로 재전송
+    PDF/TIFF 문서는 등록번호가 있는 페이지(없으면 라인이 가장 많은 페이지) 결과를 반환
+    (page, page_count 필드 추가, 페이지별 결과는 /ocr/pages 사용)
     
     Response:
     - success: 성공 여부
@@ -338,54 +429,87 @@ def ocr_endpoint():
     - lines: 라인별 텍스트 및 신뢰도
     - code: "100" (성공), 호환성용
     - data: [{text, score}] 형식, 호환성용
+    - extraction: 규칙 기반 필드 추출 결과 {fields, complete, missing}
+    - boxes: 라인별 [x_min, y_min, x_max, y_max] packed int32 배열 (boxes=1 요청 시)
+    
+    응답 포맷 (ocr_response 모듈 참고):
+    - fields=text,lines: 지정한 필드만 반환
+    - Accept: application/msgpack 또는 format=msgpack: MessagePack 인코딩
     """
     try:
-        image_bytes = None
-        
-        # 1. Multipart form-data 방식 (파일 업로드)
-        if 'image_file' in request.files:
-            file = request.files['image_file']
-            image_bytes = file.read()
-        
-        # 2. JSON 방식 (Base64 인코딩)
-        elif request.is_json:
-            data = request.get_json()
-            if data and 'image_base64' in data:
-                image_base64 = data['image_base64']
-                # data:image/xxx;base64, prefix 제거
-                if ',' in image_base64:
-                    image_base64 = image_base64.split(',')[1]
-                image_bytes = base64.b64decode(image_base64)
-        
-        # 3. multipart로 직접 전송된 바이너리 데이터
-        elif request.content_type and 'multipart/form-data' in request.content_type:
-            # 다른 필드명 시도
-            for key in request.files:
-                file = request.files[key]
-                image_bytes = file.read()
-                break
+        image_bytes = read_image_bytes()
         
         if image_bytes is None:
-            return jsonify({
+            return render({
                 "success": False,
                 "code": "400",
                 "msg": "Missing image data. Use 'image_file' (multipart) or 'image_base64' (JSON)",
                 "error": "Missing image data"
-            }), 400
+            }, 400)
         
-        # OCR 처리
-        result = process_ocr(image_bytes)
-        return jsonify(result)
+        # OCR 처리 (다중 페이지 문서는 페이지 단위로 처리)
+        if is_multipage_document(image_bytes):
+            result, boxes = process_document(image_bytes, process_ocr)
+        else:
+            result, boxes = process_ocr(image_bytes)
+        return render(result, boxes=boxes)
         
+    except ImageRefError as e:
+        return render({
+            "success": False,
+            "code": "422",
+            "msg": str(e),
+            "error": str(e)
+        }, 422)
+    except DocumentError as e:
+        return render({
+            "success": False,
+            "code": "400",
+            "msg": str(e),
+            "error": str(e)
+        }, 400)
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({
+        return render({
             "success": False,
             "code": "500",
             "msg": str(e),
             "error": str(e)
-        }), 500
+        }, 500)
+
+
+
+@app.route('/ocr/pages', methods=['POST'])
+def ocr_pages_endpoint():
+    """
+    다중 페이지 문서(PDF, TIFF) OCR 엔드포인트
+    
+    페이지를 하나씩 래스터화해 OCR 하고 결과를 NDJSON 으로 스트리밍
+    - 페이지 라인: {page, page_count, registration_found, dpi, width, height, elapsed_ms, result}
+      (래스터화에 실패한 페이지는 result: {success: false, error})
+    - 마지막 라인: {done, page_count, pages_processed, pages_failed, found_page, stopped_early, elapsed_ms}
+    손상된 문서(PDF/TIFF 를 열 수 없음)는 스트리밍 전에 400
+    
+    Query:
+    - stop_early: 등록번호 페이지를 찾으면 중단 (기본 1)
+    - max_pages: 최대 처리 페이지 수
+    """
+    try:
+        image_bytes = read_image_bytes()
+    except ImageRefError as e:
+        return render({"success": False, "code": "422", "msg": str(e), "error": str(e)}, 422)
+    if image_bytes is None:
+        return render({
+            "success": False,
+            "code": "400",
+            "msg": "Missing document data. Use 'image_file' (multipart) or 'image_base64' (JSON)",
+            "error": "Missing document data"
+        }, 400)
+    try:
+        return page_stream_response(image_bytes, process_ocr)
+    except ValueError as e:  # DocumentError 포함
+        return render({"success": False, "code": "400", "msg": str(e), "error": str(e)}, 400)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,136 @@
+"""
+모델 레지스트리 테스트 (RapidOCR 대신 가짜 엔진 사용)
+
+실행:
+    python -m pytest docker/paddleocr
+"""
+
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+
+class FakeRapidOCR:
+    """인식 모델 경로별로 호출을 막을 수 있는 가짜 RapidOCR"""
+
+    gates = {}
+
+    def __init__(self, det_model_path=None, rec_model_path=None, rec_keys_path=None):
+        self.rec_model = rec_model_path
+
+    def __call__(self, image_bytes):
+        gate = self.gates.get(self.rec_model)
+        if gate is not None:
+            gate.wait(5)
+        return [[[[0, 0], [1, 0], [1, 1], [0, 1]], "123-45-67891", 0.9]], None
+
+
+sys.modules.setdefault("rapidocr_onnxruntime", types.SimpleNamespace(RapidOCR=FakeRapidOCR))
+
+import model_registry  # noqa: E402
+from model_registry import ModelRegistry  # noqa: E402
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(model_registry, "WARMUP_ROUNDS", 0)
+    monkeypatch.setattr(FakeRapidOCR, "gates", {})
+    registry = ModelRegistry(score_fn=lambda result: 0.5)
+    registry.load_initial("det.onnx", "rec-a.onnx", "keys-a.txt")
+    return registry
+
+
+def load(registry, rec_model, mode="swap", shadow_percent=0.0):
+    """후보 모델을 로드하고 백그라운드 로드가 끝날 때까지 대기"""
+    registry.start_candidate("det.onnx", rec_model, "keys.txt", mode, shadow_percent)
+    assert wait_until(lambda: registry.describe()["status"]["state"] != "loading")
+    return registry.describe()
+
+
+def test_in_flight_request_keeps_old_model_until_release(registry):
+    old = registry.active
+
+    with registry.acquire() as model:
+        assert load(registry, "rec-b.onnx")["status"]["state"] == "swapped"
+        assert registry.active is not old
+        assert model is old
+        # 처리 중인 요청이 있으므로 기존 세션은 해제되지 않음
+        time.sleep(0.1)
+        assert old.ocr is not None
+
+    assert wait_until(lambda: old.ocr is None)
+    assert registry.active.rec_model == "rec-b.onnx"
+
+
+def test_shadow_runs_beyond_pending_limit_are_skipped(registry):
+    gate = FakeRapidOCR.gates["rec-b.onnx"] = threading.Event()
+    assert load(registry, "rec-b.onnx", "shadow", 100.0)["shadow"]["samples"] == 0
+
+    for _ in range(5):
+        registry.maybe_shadow(b"image", 10.0, 0.5)
+    shadow = registry.describe()["shadow"]
+    assert shadow["skipped"] == 5 - model_registry.SHADOW_MAX_PENDING
+    assert shadow["samples"] == 0
+
+    gate.set()
+    assert wait_until(lambda: registry.describe()["shadow"]["samples"] == model_registry.SHADOW_MAX_PENDING)
+    assert wait_until(lambda: registry._shadow_pending == 0)
+    assert registry.describe()["shadow"]["candidate"]["in_flight"] == 0
+
+
+def test_promote_replaces_active_and_releases_old_model(registry):
+    old = registry.active
+    load(registry, "rec-b.onnx", "shadow", 50.0)
+
+    promoted = registry.promote()
+
+    assert registry.active is promoted
+    assert promoted.rec_model == "rec-b.onnx"
+    described = registry.describe()
+    assert described["shadow"] is None
+    assert described["status"]["state"] == "swapped"
+    assert wait_until(lambda: old.ocr is None)
+    with pytest.raises(RuntimeError):
+        registry.promote()
+
+
+def test_discard_releases_candidate_and_keeps_active(registry):
+    active = registry.active
+    load(registry, "rec-b.onnx", "shadow", 50.0)
+    candidate = registry._candidate
+
+    registry.discard()
+
+    assert registry.active is active
+    assert registry.describe() == dict(registry.describe(), status={"state": "idle"}, shadow=None)
+    assert wait_until(lambda: candidate.ocr is None)
+    assert active.ocr is not None
+
+
+def test_swap_discards_live_shadow_candidate(registry):
+    load(registry, "rec-b.onnx", "shadow", 100.0)
+    shadow_candidate = registry._candidate
+
+    described = load(registry, "rec-c.onnx")
+
+    assert described["status"]["state"] == "swapped"
+    assert described["active"]["rec_model"] == "rec-c.onnx"
+    assert described["shadow"] is None
+    assert wait_until(lambda: shadow_candidate.ocr is None)
+    # 폐기된 후보로 더 이상 복제 실행하거나 promote 하지 않음
+    registry.maybe_shadow(b"image", 10.0, 0.5)
+    assert shadow_candidate._in_flight == 0
+    with pytest.raises(RuntimeError):
+        registry.promote()
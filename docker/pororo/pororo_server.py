@@ -4,13 +4,19 @@ Kakaobrain Pororo 기반 한국어 OCR/NLP
 포트: 9004
 """
 
-import base64
 import os
-from flask import Flask, request, jsonify
+import tempfile
+from flask import Flask, jsonify
 from flask_cors import CORS
 
+from document_pages import DocumentError, is_multipage_document, page_stream_response, process_document
+from ocr_input import ImageRefError, read_image_bytes
+from ocr_response import box_to_rect, render
+from profiler import debug_blueprint
+
 app = Flask(__name__)
 CORS(app)
+app.register_blueprint(debug_blueprint)
 
 # OCR 엔진 초기화
 print("=" * 50)
@@ -76,6 +82,95 @@ def health():
     })
 
 
+def process_ocr(image_bytes):
+    """
+    이미지 바이트로 OCR 처리
+    
+    Returns:
+        (응답 dict, 라인별 박스 좌표 또는 None)
+    """
+    # 임시 파일로 저장 (OCR 엔진은 파일 경로 필요)
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        f.write(image_bytes)
+        temp_path = f.name
+    
+    try:
+        lines = []
+        # 라인별 박스 좌표 (엔진이 좌표를 제공하지 않으면 None)
+        boxes = None
+        full_text = ""
+        
+        if engine_name == "pororo":
+            # Pororo OCR 실행
+            result = ocr(temp_path)
+            
+            # 결과 처리 - Pororo는 문자열 또는 리스트 반환
+            if isinstance(result, str):
+                full_text = result
+                lines = [{"text": line, "confidence": 0.95} for line in result.split('\n') if line.strip()]
+            elif isinstance(result, list):
+                # 리스트인 경우 각 요소 처리
+                text_items = []
+                item_boxes = []
+                for item in result:
+                    if isinstance(item, tuple) and len(item) >= 2:
+                        # (box, text) 또는 (box, text, confidence) 형태
+                        text_items.append(str(item[1]))
+                        conf = float(item[2]) if len(item) > 2 else 0.95
+                        lines.append({"text": str(item[1]), "confidence": conf})
+                        try:
+                            item_boxes.append(box_to_rect(item[0]))
+                        except (TypeError, IndexError, ValueError):
+                            pass  # 좌표 형식이 다르면 박스 없이 반환
+                    else:
+                        text_items.append(str(item))
+                        lines.append({"text": str(item), "confidence": 0.95})
+                full_text = '\n'.join(text_items)
+                if item_boxes and len(item_boxes) == len(lines):
+                    boxes = item_boxes
+            else:
+                full_text = str(result)
+                lines = [{"text": full_text, "confidence": 0.95}]
+                
+        elif engine_name in ["easyocr", "easyocr-cpu"]:
+            # EasyOCR 실행 - CUDA OOM 발생 시 CPU fallback
+            try:
+                result = ocr.readtext(temp_path)
+            except RuntimeError as cuda_err:
+                if "CUDA" in str(cuda_err) or "out of memory" in str(cuda_err):
+                    print(f"GPU memory error, falling back to CPU: {cuda_err}")
+                    # GPU 메모리 정리
+                    import torch
+                    if torch.cuda.is_available():
+                        torch.cuda.empty_cache()
+                    # CPU로 재시도
+                    import easyocr
+                    cpu_reader = easyocr.Reader(['ko', 'en'], gpu=False)
+                    result = cpu_reader.readtext(temp_path)
+                else:
+                    raise cuda_err
+                    
+            if result:
+                lines = [{"text": item[1], "confidence": float(item[2])} for item in result]
+                boxes = [box_to_rect(item[0]) for item in result]
+                full_text = '\n'.join([item[1] for item in result])
+        
+        korean_ratio = calculate_korean_ratio(full_text)
+        
+        return {
+            "success": True,
+            "text": full_text,
+            "lines": lines,
+            "line_count": len(lines),
+            "korean_ratio": round(korean_ratio, 3),
+            "engine": engine_name
+        }, boxes
+        
+    finally:
+        # 임시 파일 삭제
+        os.unlink(temp_path)
+
+
 @app.route('/ocr', methods=['POST'])
 def ocr_endpoint():
     """
@@ -84,122 +179,88 @@ def ocr_endpoint():
     지원 형식:
     1. Multipart form-data: 'image_file' 필드로 이미지 파일 업로드
     2. JSON: 'image_base64' 필드로 Base64 인코딩된 이미지
+    3. 같은 호스트: 'image_shm'(공유 메모리) 또는 'image_path'(공유 볼륨) 참조 (ocr_input 모듈 참고)
+       매핑할 수 없고 업로드도 없으면 422 → 일반 업로드로 재전송
+    PDF/TIFF 문서는 등록번호가 있는 페이지(없으면 라인이 가장 많은 페이지) 결과를 반환
+    (page, page_count 필드 추가, 페이지별 결과는 /ocr/pages 사용)
+    
+    응답 포맷 (ocr_response 모듈 참고):
+    - fields=text,lines: 지정한 필드만 반환
+    - boxes=1: 라인별 [x_min, y_min, x_max, y_max] packed int32 배열 포함 (엔진이 좌표를 줄 때만)
+    - Accept: application/msgpack 또는 format=msgpack: MessagePack 인코딩
     """
     if not ocr:
-        return jsonify({
+        return render({
             "success": False,
             "error": "OCR engine not initialized"
-        }), 500
+        }, 500)
     
     try:
-        image_bytes = None
-        
-        # 1. Multipart form-data 방식
-        if 'image_file' in request.files:
-            file = request.files['image_file']
-            image_bytes = file.read()
-        
-        # 2. JSON 방식 (Base64)
-        elif request.is_json:
-            data = request.get_json()
-            if data and 'image_base64' in data:
-                image_base64 = data['image_base64']
-                if ',' in image_base64:
-                    image_base64 = image_base64.split(',')[1]
-                image_bytes = base64.b64decode(image_base64)
-        
-        # 3. multipart 다른 필드명
-        elif request.content_type and 'multipart/form-data' in request.content_type:
-            for key in request.files:
-                file = request.files[key]
-                image_bytes = file.read()
-                break
+        image_bytes = read_image_bytes()
         
         if image_bytes is None:
-            return jsonify({
+            return render({
                 "success": False,
                 "error": "Missing image data"
-            }), 400
+            }, 400)
         
-        # 임시 파일로 저장 (OCR 엔진은 파일 경로 필요)
-        import tempfile
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
-            f.write(image_bytes)
-            temp_path = f.name
-        
-        try:
-            lines = []
-            full_text = ""
-            
-            if engine_name == "pororo":
-                # Pororo OCR 실행
-                result = ocr(temp_path)
-                
-                # 결과 처리 - Pororo는 문자열 또는 리스트 반환
-                if isinstance(result, str):
-                    full_text = result
-                    lines = [{"text": line, "confidence": 0.95} for line in result.split('\n') if line.strip()]
-                elif isinstance(result, list):
-                    # 리스트인 경우 각 요소 처리
-                    text_items = []
-                    for item in result:
-                        if isinstance(item, tuple) and len(item) >= 2:
-                            # (box, text) 또는 (box, text, confidence) 형태
-                            text_items.append(str(item[1]))
-                            conf = float(item[2]) if len(item) > 2 else 0.95
-                            lines.append({"text": str(item[1]), "confidence": conf})
-                        else:
-                            text_items.append(str(item))
-                            lines.append({"text": str(item), "confidence": 0.95})
-                    full_text = '\n'.join(text_items)
-                else:
-                    full_text = str(result)
-                    lines = [{"text": full_text, "confidence": 0.95}]
-                    
-            elif engine_name in ["easyocr", "easyocr-cpu"]:
-                # EasyOCR 실행 - CUDA OOM 발생 시 CPU fallback
-                try:
-                    result = ocr.readtext(temp_path)
-                except RuntimeError as cuda_err:
-                    if "CUDA" in str(cuda_err) or "out of memory" in str(cuda_err):
-                        print(f"GPU memory error, falling back to CPU: {cuda_err}")
-                        # GPU 메모리 정리
-                        import torch
-                        if torch.cuda.is_available():
-                            torch.cuda.empty_cache()
-                        # CPU로 재시도
-                        import easyocr
-                        cpu_reader = easyocr.Reader(['ko', 'en'], gpu=False)
-                        result = cpu_reader.readtext(temp_path)
-                    else:
-                        raise cuda_err
-                        
-                if result:
-                    lines = [{"text": item[1], "confidence": float(item[2])} for item in result]
-                    full_text = '\n'.join([item[1] for item in result])
-            
-            korean_ratio = calculate_korean_ratio(full_text)
-            
-            return jsonify({
-                "success": True,
-                "text": full_text,
-                "lines": lines,
-                "line_count": len(lines),
-                "korean_ratio": round(korean_ratio, 3),
-                "engine": engine_name
-            })
-            
-        finally:
-            # 임시 파일 삭제
-            os.unlink(temp_path)
+        # 다중 페이지 문서는 페이지 단위로 처리
+        if is_multipage_document(image_bytes):
+            result, boxes = process_document(image_bytes, process_ocr)
+        else:
+            result, boxes = process_ocr(image_bytes)
+        return render(result, boxes=boxes)
         
+    except ImageRefError as e:
+        return render({
+            "success": False,
+            "error": str(e)
+        }, 422)
+    except DocumentError as e:
+        return render({
+            "success": False,
+            "error": str(e)
+        }, 400)
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({
+        return render({
+            "success": False,
+            "error": str(e)
+        }, 500)
+
+
+@app.route('/ocr/pages', methods=['POST'])
+def ocr_pages_endpoint():
+    """
+    다중 페이지 문서(PDF, TIFF) OCR 엔드포인트
+    페이지별 결과를 NDJSON 으로 스트리밍 (document_pages 모듈 참고)
+    """
+    if not ocr:
+        return render({
+            "success": False,
+            "error": "OCR engine not initialized"
+        }, 500)
+    
+    try:
+        image_bytes = read_image_bytes()
+    except ImageRefError as e:
+        return render({
+            "success": False,
+            "error": str(e)
+        }, 422)
+    if image_bytes is None:
+        return render({
+            "success": False,
+            "error": "Missing document data"
+        }, 400)
+    try:
+        return page_stream_response(image_bytes, process_ocr)
+    except ValueError as e:  # DocumentError 포함
+        return render({
             "success": False,
             "error": str(e)
-        }), 500
+        }, 400)
 
 
 if __name__ == '__main__':
@@ -1,6 +1,7 @@
 package com.provider.easyocr
 
 import com.common.ocr.OcrRawResult
+import com.provider.image.SharedImageHandoff
 import java.time.Duration
 import org.slf4j.LoggerFactory
 import org.springframework.beans.factory.annotation.Value
@@ -9,6 +10,7 @@ import org.springframework.http.client.MultipartBodyBuilder
 import org.springframework.stereotype.Component
 import org.springframework.web.reactive.function.BodyInserters
 import org.springframework.web.reactive.function.client.WebClient
+import org.springframework.web.reactive.function.client.WebClientResponseException
 
 /**
  * EasyOCR API Provider
@@ -17,7 +19,8 @@ import org.springframework.web.reactive.function.client.WebClient
 @Component
 class EasyOcrProvider(
     @Value("\${easyocr.api-url:http://localhost:9005}") private val apiUrl: String,
-    @Value("\${easyocr.timeout:60s}") private val timeout: String
+    @Value("\${easyocr.timeout:60s}") private val timeout: String,
+    private val imageHandoff: SharedImageHandoff
 ) {
     private val logger = LoggerFactory.getLogger(EasyOcrProvider::class.java)
     private val webClient = WebClient.builder().baseUrl(apiUrl).build()
@@ -30,21 +33,7 @@ class EasyOcrProvider(
         return try {
             logger.info("Starting EasyOCR extraction...")
 
-            val bodyBuilder = MultipartBodyBuilder()
-            bodyBuilder
-                .part("image_file", imageBytes)
-                .filename("image.png")
-                .contentType(MediaType.IMAGE_PNG)
-
-            val response =
-                webClient
-                    .post()
-                    .uri("/ocr")
-                    .contentType(MediaType.MULTIPART_FORM_DATA)
-                    .body(BodyInserters.fromMultipartData(bodyBuilder.build()))
-                    .retrieve()
-                    .bodyToMono(EasyOcrResponse::class.java)
-                    .block(timeoutDuration)
+            val response = postOcr(imageBytes)
 
             if (response?.success == true) {
                 logger.info("EasyOCR completed, extracted ${response.line_count} lines")
@@ -73,6 +62,40 @@ class EasyOcrProvider(
         }
     }
 
+    /** 공유 디렉토리에 기록된 이미지면 경로로 먼저 요청하고, 서버가 매핑하지 못하면(4xx) multipart 업로드로 요청 */
+    private fun postOcr(imageBytes: ByteArray): EasyOcrResponse? {
+        imageHandoff.containerPath(imageBytes)?.let { path ->
+            try {
+                return webClient
+                    .post()
+                    .uri("/ocr")
+                    .contentType(MediaType.APPLICATION_JSON)
+                    .bodyValue(mapOf("image_path" to path))
+                    .retrieve()
+                    .bodyToMono(EasyOcrResponse::class.java)
+                    .block(timeoutDuration)
+            } catch (e: WebClientResponseException) {
+                if (!e.statusCode.is4xxClientError) throw e
+                logger.warn("EasyOCR could not map shared image ($path), falling back to upload: ${e.statusCode}")
+            }
+        }
+
+        val bodyBuilder = MultipartBodyBuilder()
+        bodyBuilder
+            .part("image_file", imageBytes)
+            .filename("image.png")
+            .contentType(MediaType.IMAGE_PNG)
+
+        return webClient
+            .post()
+            .uri("/ocr")
+            .contentType(MediaType.MULTIPART_FORM_DATA)
+            .body(BodyInserters.fromMultipartData(bodyBuilder.build()))
+            .retrieve()
+            .bodyToMono(EasyOcrResponse::class.java)
+            .block(timeoutDuration)
+    }
+
     /** 헬스체크 */
     fun isHealthy(): Boolean {
         return try {
@@ -3,6 +3,7 @@ package com.provider.ensemble
 import com.application.port.out.OcrPort
 import com.common.ocr.OcrRawResult
 import com.provider.easyocr.EasyOcrProvider
+import com.provider.image.SharedImageHandoff
 import com.provider.paddleocr.PaddleOcrApiProvider
 import com.provider.pororo.PororoOcrProvider
 import jakarta.annotation.PostConstruct
@@ -21,6 +22,7 @@ class EnsembleOcrProvider(
         private val paddleOcrProvider: PaddleOcrApiProvider,
         private val pororoOcrProvider: PororoOcrProvider,
         private val easyOcrProvider: EasyOcrProvider,
+        private val imageHandoff: SharedImageHandoff,
         @Value("\${ensemble.timeout:90}") private val timeoutSeconds: Long,
         @Value("\${ensemble.enabled:true}") private val ensembleEnabled: Boolean
 ) : OcrPort {
@@ -49,8 +51,15 @@ class EnsembleOcrProvider(
                 }
         }
 
-        /** 3개 OCR 엔진 병렬 실행 (Coroutines) */
-        suspend fun extractTextParallel(imageBytes: ByteArray): EnsembleOcrResult = coroutineScope {
+        /**
+         * 3개 OCR 엔진 병렬 실행 (Coroutines)
+         *
+         * 공유 디렉토리(ocr.handoff.host-dir)가 설정되어 있으면 이미지를 한 번만 기록하고 세 엔진이 같은 파일을 매핑
+         */
+        suspend fun extractTextParallel(imageBytes: ByteArray): EnsembleOcrResult =
+                imageHandoff.share(imageBytes) { runEngines(imageBytes) }
+
+        private suspend fun runEngines(imageBytes: ByteArray): EnsembleOcrResult = coroutineScope {
                 logger.info("=== 앙상블 OCR 시작 (Coroutines 병렬 실행) ===")
                 val startTime = System.currentTimeMillis()
 
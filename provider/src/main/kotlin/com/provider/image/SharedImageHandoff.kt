@@ -0,0 +1,78 @@
+package com.provider.image
+
+import java.nio.file.Files
+import java.nio.file.Path
+import java.nio.file.Paths
+import java.util.Collections
+import java.util.IdentityHashMap
+import org.slf4j.LoggerFactory
+import org.springframework.beans.factory.annotation.Value
+import org.springframework.stereotype.Component
+
+/**
+ * 공유 tmpfs 디렉토리를 통한 이미지 전달
+ *
+ * Worker 와 OCR 컨테이너가 같은 호스트에 있을 때 이미지를 공유 디렉토리에 한 번만 기록하고 OCR 서버에는 경로(image_path)만
+ * 전달하여, 엔진마다 반복되는 multipart 직렬화/파싱 복사를 생략합니다.
+ *
+ * 수명 규약:
+ * - 파일은 Worker 가 생성하고, [share] 블록이 끝나면(모든 엔진 응답 수신 후) Worker 가 삭제
+ * - OCR 서버는 읽기 전용으로 매핑만 하고 쓰거나 삭제하지 않음
+ * - 기록에 실패하면 경로 없이 실행되고, 서버가 매핑하지 못하면(4xx) Provider 가 multipart 업로드로 재요청
+ *
+ * ocr.handoff.host-dir 이 비어 있으면 비활성화 (docker-compose 의 OCR_HANDOFF_DIR 과 같은 디렉토리)
+ */
+@Component
+class SharedImageHandoff(
+        @Value("\${ocr.handoff.host-dir:}") private val hostDir: String,
+        @Value("\${ocr.handoff.container-dir:/handoff}") private val containerDir: String
+) {
+    private val logger = LoggerFactory.getLogger(SharedImageHandoff::class.java)
+
+    // 공유 중인 이미지 (같은 ByteArray 인스턴스 기준) -> OCR 컨테이너 내부 경로
+    private val shared = Collections.synchronizedMap(IdentityHashMap<ByteArray, String>())
+
+    val enabled: Boolean
+        get() = hostDir.isNotBlank()
+
+    /** 블록 실행 동안 이미지를 공유 디렉토리에 기록 (이미 공유 중이면 그대로 실행) */
+    inline fun <T> share(imageBytes: ByteArray, block: () -> T): T {
+        val file = acquire(imageBytes) ?: return block()
+        try {
+            return block()
+        } finally {
+            release(imageBytes, file)
+        }
+    }
+
+    /** 공유 중인 이미지의 OCR 컨테이너 내부 경로 (없으면 null) */
+    fun containerPath(imageBytes: ByteArray): String? = shared[imageBytes]
+
+    @PublishedApi
+    internal fun acquire(imageBytes: ByteArray): Path? {
+        if (!enabled || shared.containsKey(imageBytes)) return null
+
+        var file: Path? = null
+        return try {
+            val dir = Files.createDirectories(Paths.get(hostDir))
+            file = Files.createTempFile(dir, "ocr-", ".img")
+            Files.write(file, imageBytes)
+            shared[imageBytes] = "$containerDir/${file.fileName}"
+            file
+        } catch (e: Exception) {
+            logger.warn("Shared image handoff unavailable, using upload: ${e.message}")
+            file?.let { Files.deleteIfExists(it) }
+            null
+        }
+    }
+
+    @PublishedApi
+    internal fun release(imageBytes: ByteArray, file: Path) {
+        shared.remove(imageBytes)
+        try {
+            Files.deleteIfExists(file)
+        } catch (e: Exception) {
+            logger.warn("Failed to delete shared image $file: ${e.message}")
+        }
+    }
+}
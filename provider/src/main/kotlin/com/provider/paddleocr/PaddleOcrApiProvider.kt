@@ -1,9 +1,11 @@
 package com.provider.paddleocr
 
 import com.application.port.out.OcrPort
+import com.common.ocr.OcrParsedData
 import com.common.ocr.OcrRawResult
 import com.fasterxml.jackson.annotation.JsonProperty
 import com.fasterxml.jackson.databind.ObjectMapper
+import com.provider.image.SharedImageHandoff
 import jakarta.annotation.PostConstruct
 import java.time.Duration
 import org.slf4j.LoggerFactory
@@ -14,6 +16,7 @@ import org.springframework.http.MediaType
 import org.springframework.http.client.SimpleClientHttpRequestFactory
 import org.springframework.stereotype.Component
 import org.springframework.util.LinkedMultiValueMap
+import org.springframework.web.client.HttpClientErrorException
 import org.springframework.web.client.RestClient
 
 /**
@@ -27,9 +30,15 @@ import org.springframework.web.client.RestClient
 @Component
 class PaddleOcrApiProvider(
         @Value("\${paddleocr.api-url:http://localhost:9003}") private val apiUrl: String,
-        @Value("\${paddleocr.timeout:60}") private val timeoutSeconds: Long = 60
+        @Value("\${paddleocr.timeout:60}") private val timeoutSeconds: Long = 60,
+        private val imageHandoff: SharedImageHandoff
 ) : OcrPort {
 
+    companion object {
+        /** RapidOCR 응답에서 사용하는 필드 목록 */
+        private const val RESPONSE_FIELDS = "success,code,msg,text,lines,line_count,extraction"
+    }
+
     private val logger = LoggerFactory.getLogger(PaddleOcrApiProvider::class.java)
     private val restClient: RestClient
     private val objectMapper = ObjectMapper()
@@ -49,29 +58,15 @@ class PaddleOcrApiProvider(
         logger.info("RapidOCR API Provider initialized with URL: $apiUrl (using RestClient)")
     }
 
-    /** 이미지에서 텍스트를 추출합니다. */
-    override fun extractText(imageBytes: ByteArray): OcrRawResult {
+    /** 이미지에서 텍스트를 추출합니다. (공유 디렉토리 설정 시 앙상블 밖에서 호출되어도 경로로 전달) */
+    override fun extractText(imageBytes: ByteArray): OcrRawResult =
+            imageHandoff.share(imageBytes) { requestOcr(imageBytes) }
+
+    private fun requestOcr(imageBytes: ByteArray): OcrRawResult {
         return try {
             logger.info("Starting OCR extraction via RapidOCR API...")
 
-            // 이미지를 Resource로 변환
-            val imageResource =
-                    object : ByteArrayResource(imageBytes) {
-                        override fun getFilename(): String = "image.png"
-                    }
-
-            val body = LinkedMultiValueMap<String, Any>()
-            body.add("image_file", imageResource)
-
-            // RestClient를 사용한 Fluent API 호출
-            val responseStr =
-                    restClient
-                            .post()
-                            .uri("/ocr")
-                            .contentType(MediaType.MULTIPART_FORM_DATA)
-                            .body(body)
-                            .retrieve()
-                            .body(String::class.java)
+            val responseStr = postOcr(imageBytes)
 
             if (responseStr.isNullOrEmpty()) {
                 logger.error("RapidOCR API returned empty response")
@@ -123,19 +118,60 @@ class PaddleOcrApiProvider(
             val fullText = response.text ?: textLines.joinToString("\n")
 
             logger.info("OCR completed, extracted ${textLines.size} lines")
+            response.extraction?.let {
+                logger.info("Field extraction: complete=${it.complete}, missing=${it.missing}")
+            }
 
             OcrRawResult(
                     fullText = fullText,
                     lines = textLines,
                     success = true,
                     confidence = avgConfidence,
-                    engine = "paddleocr"
+                    engine = "paddleocr",
+                    extractedFields = response.extraction?.toParsedData(),
+                    fieldsComplete = response.extraction?.complete == true
             )
         } catch (e: Exception) {
             logger.error("RapidOCR API call failed: ${e.message}", e)
             OcrRawResult.error("RapidOCR API call failed: ${e.message}", "paddleocr")
         }
     }
+
+    /** 공유 디렉토리에 기록된 이미지면 경로로 먼저 요청하고, 서버가 매핑하지 못하면(4xx) multipart 업로드로 요청 */
+    private fun postOcr(imageBytes: ByteArray): String? {
+        // fields: 중복되는 호환성 필드(data)를 제외하고 필요한 필드만 요청
+        imageHandoff.containerPath(imageBytes)?.let { path ->
+            try {
+                return restClient
+                        .post()
+                        .uri("/ocr?fields={fields}", RESPONSE_FIELDS)
+                        .contentType(MediaType.APPLICATION_JSON)
+                        .body(mapOf("image_path" to path))
+                        .retrieve()
+                        .body(String::class.java)
+            } catch (e: HttpClientErrorException) {
+                logger.warn("RapidOCR could not map shared image ($path), falling back to upload: ${e.statusCode}")
+            }
+        }
+
+        // 이미지를 Resource로 변환
+        val imageResource =
+                object : ByteArrayResource(imageBytes) {
+                    override fun getFilename(): String = "image.png"
+                }
+
+        val body = LinkedMultiValueMap<String, Any>()
+        body.add("image_file", imageResource)
+
+        // RestClient를 사용한 Fluent API 호출
+        return restClient
+                .post()
+                .uri("/ocr?fields={fields}", RESPONSE_FIELDS)
+                .contentType(MediaType.MULTIPART_FORM_DATA)
+                .body(body)
+                .retrieve()
+                .body(String::class.java)
+    }
 }
 
 // RapidOCR Response DTOs
@@ -150,7 +186,9 @@ data class RapidOcrResponse(
         @JsonProperty("text") val text: String? = null,
         @JsonProperty("lines") val lines: List<RapidOcrLineItem>? = null,
         @JsonProperty("line_count") val lineCount: Int? = null,
-        @JsonProperty("elapsed_time") val elapsedTime: Any? = null
+        @JsonProperty("elapsed_time") val elapsedTime: Any? = null,
+        // 규칙 기반 필드 추출 결과
+        @JsonProperty("extraction") val extraction: RapidOcrExtraction? = null
 )
 
 @com.fasterxml.jackson.annotation.JsonIgnoreProperties(ignoreUnknown = true)
@@ -165,3 +203,33 @@ data class RapidOcrLineItem(
         @JsonProperty("text") val text: String? = null,
         @JsonProperty("confidence") val confidence: Double? = null
 )
+
+@com.fasterxml.jackson.annotation.JsonIgnoreProperties(ignoreUnknown = true)
+data class RapidOcrExtraction(
+        @JsonProperty("fields") val fields: Map<String, RapidOcrField>? = null,
+        @JsonProperty("complete") val complete: Boolean? = null,
+        @JsonProperty("missing") val missing: List<String>? = null
+) {
+    /** 검증을 통과한 필드만 OcrParsedData로 변환 */
+    fun toParsedData(): OcrParsedData {
+        val values = fields.orEmpty().filterValues { it.valid == true }.mapValues { it.value.value }
+        return OcrParsedData(
+                merchantName = values["merchantName"],
+                businessNumber = values["businessNumber"],
+                representativeName = values["representativeName"],
+                address = values["address"],
+                businessType = values["businessType"],
+                businessItem = values["businessItem"],
+                openingDate = values["openingDate"],
+                corporateNumber = values["corporateNumber"],
+                headOfficeAddress = values["headOfficeAddress"]
+        )
+    }
+}
+
+@com.fasterxml.jackson.annotation.JsonIgnoreProperties(ignoreUnknown = true)
+data class RapidOcrField(
+        @JsonProperty("value") val value: String? = null,
+        @JsonProperty("confidence") val confidence: Double? = null,
+        @JsonProperty("valid") val valid: Boolean? = null
+)
@@ -1,6 +1,7 @@
 package com.provider.pororo
 
 import com.common.ocr.OcrRawResult
+import com.provider.image.SharedImageHandoff
 import java.time.Duration
 import org.slf4j.LoggerFactory
 import org.springframework.beans.factory.annotation.Value
@@ -9,12 +10,14 @@ import org.springframework.http.client.MultipartBodyBuilder
 import org.springframework.stereotype.Component
 import org.springframework.web.reactive.function.BodyInserters
 import org.springframework.web.reactive.function.client.WebClient
+import org.springframework.web.reactive.function.client.WebClientResponseException
 
 /** Pororo OCR API Provider Kakaobrain Pororo 기반 한국어 OCR 서비스 클라이언트 */
 @Component
 class PororoOcrProvider(
         @Value("\${pororo.api-url:http://localhost:9004}") private val apiUrl: String,
-        @Value("\${pororo.timeout:60s}") private val timeout: String
+        @Value("\${pororo.timeout:60s}") private val timeout: String,
+        private val imageHandoff: SharedImageHandoff
 ) {
     private val logger = LoggerFactory.getLogger(PororoOcrProvider::class.java)
     private val webClient = WebClient.builder().baseUrl(apiUrl).build()
@@ -27,21 +30,7 @@ class PororoOcrProvider(
         return try {
             logger.info("Starting Pororo OCR extraction...")
 
-            val bodyBuilder = MultipartBodyBuilder()
-            bodyBuilder
-                    .part("image_file", imageBytes)
-                    .filename("image.png")
-                    .contentType(MediaType.IMAGE_PNG)
-
-            val response =
-                    webClient
-                            .post()
-                            .uri("/ocr")
-                            .contentType(MediaType.MULTIPART_FORM_DATA)
-                            .body(BodyInserters.fromMultipartData(bodyBuilder.build()))
-                            .retrieve()
-                            .bodyToMono(PororoOcrResponse::class.java)
-                            .block(timeoutDuration)
+            val response = postOcr(imageBytes)
 
             if (response?.success == true) {
                 logger.info("Pororo OCR completed, extracted ${response.line_count} lines")
@@ -70,6 +59,40 @@ class PororoOcrProvider(
         }
     }
 
+    /** 공유 디렉토리에 기록된 이미지면 경로로 먼저 요청하고, 서버가 매핑하지 못하면(4xx) multipart 업로드로 요청 */
+    private fun postOcr(imageBytes: ByteArray): PororoOcrResponse? {
+        imageHandoff.containerPath(imageBytes)?.let { path ->
+            try {
+                return webClient
+                        .post()
+                        .uri("/ocr")
+                        .contentType(MediaType.APPLICATION_JSON)
+                        .bodyValue(mapOf("image_path" to path))
+                        .retrieve()
+                        .bodyToMono(PororoOcrResponse::class.java)
+                        .block(timeoutDuration)
+            } catch (e: WebClientResponseException) {
+                if (!e.statusCode.is4xxClientError) throw e
+                logger.warn("Pororo could not map shared image ($path), falling back to upload: ${e.statusCode}")
+            }
+        }
+
+        val bodyBuilder = MultipartBodyBuilder()
+        bodyBuilder
+                .part("image_file", imageBytes)
+                .filename("image.png")
+                .contentType(MediaType.IMAGE_PNG)
+
+        return webClient
+                .post()
+                .uri("/ocr")
+                .contentType(MediaType.MULTIPART_FORM_DATA)
+                .body(BodyInserters.fromMultipartData(bodyBuilder.build()))
+                .retrieve()
+                .bodyToMono(PororoOcrResponse::class.java)
+                .block(timeoutDuration)
+    }
+
     /** 헬스체크 */
     fun isHealthy(): Boolean {
         return try {
@@ -2,6 +2,8 @@ package com.worker.consumer
 
 import com.application.port.out.TextProcessorPort
 import com.common.event.OcrRequestEvent
+import com.common.ocr.OcrParsedData
+import com.common.ocr.OcrRawResult
 import com.common.util.getLogger
 import com.domain.documents.OcrDocument
 import com.domain.repository.OcrCacheRepository
@@ -17,7 +19,8 @@ class OcrEventConsumer(
         private val ensembleOcrProvider: EnsembleOcrProvider,
         private val textProcessorPort: TextProcessorPort,
         private val ocrCacheRepository: OcrCacheRepository,
-        @Value("\${ensemble.enabled:true}") private val ensembleEnabled: Boolean
+        @Value("\${ensemble.enabled:true}") private val ensembleEnabled: Boolean,
+        @Value("\${ocr.fast-path.enabled:true}") private val fastPathEnabled: Boolean
 ) {
     private val logger = getLogger()
     private val restClient = RestClient.create()
@@ -26,7 +29,7 @@ class OcrEventConsumer(
      * OCR 이벤트 처리 파이프라인 (앙상블 버전)
      * 1. 이미지 다운로드
      * 2. 3개 OCR 엔진 병렬 실행 (PaddleOCR, Pororo, EasyOCR)
-     * 3. Gemma3로 교차검증 + 필드 파싱
+     * 3. Gemma3로 교차검증 + 필드 파싱 (규칙 기반 추출이 모든 필수 필드를 검증했다면 생략)
      * 4. Redis에 결과 저장
      */
     @KafkaListener(topics = ["mms.ocr.business-license.request"], groupId = "mms.ocr.worker-group")
@@ -73,18 +76,21 @@ class OcrEventConsumer(
                 return
             }
 
-            // 3. Gemma3로 교차검증 + 필드 파싱
-            val ensembleResultsText = ensembleResult.toPromptFormat()
-            logger.info("=== 앙상블 결과 (Gemma3 입력) ===")
-            logger.info(ensembleResultsText)
-            logger.info("================================")
-
+            // 3. 규칙 기반 추출 결과가 충분하면 사용, 아니면 Gemma3로 교차검증 + 필드 파싱
             val parsedData =
-                    textProcessorPort.crossValidateAndParse(
-                            ensembleResults = ensembleResultsText,
-                            documentType = event.documentType,
-                            businessType = event.businessType
-                    )
+                    fastPathResult(event, ensembleResult.paddleOcr)
+                            ?: run {
+                                val ensembleResultsText = ensembleResult.toPromptFormat()
+                                logger.info("=== 앙상블 결과 (Gemma3 입력) ===")
+                                logger.info(ensembleResultsText)
+                                logger.info("================================")
+
+                                textProcessorPort.crossValidateAndParse(
+                                        ensembleResults = ensembleResultsText,
+                                        documentType = event.documentType,
+                                        businessType = event.businessType
+                                )
+                            }
             parsedData.toMap().forEach { (key, value) -> logger.info("  $key: $value") }
             logger.info("========================================")
 
@@ -112,6 +118,27 @@ class OcrEventConsumer(
         }
     }
 
+    /**
+     * 규칙 기반 필드 추출 결과로 LLM 파싱을 생략할 수 있으면 해당 결과를 반환합니다.
+     * 사업자등록증이고 필수 필드가 모두 검증을 통과한 경우에만 사용하며, 법인사업자는 법인등록번호도 필요합니다.
+     */
+    private fun fastPathResult(
+            event: OcrRequestEvent,
+            ocrResult: OcrRawResult
+    ): OcrParsedData? {
+        val extractedFields = ocrResult.extractedFields
+        if (!fastPathEnabled || !ocrResult.fieldsComplete || extractedFields == null) return null
+        if (!event.documentType.equals("BUSINESS_LICENSE", ignoreCase = true)) return null
+        if (event.businessType.equals("CORPORATE", ignoreCase = true) &&
+                        extractedFields.corporateNumber.isNullOrEmpty()
+        ) {
+            return null
+        }
+
+        logger.info("규칙 기반 필드 추출 검증 통과 - Gemma3 파싱 생략")
+        return extractedFields
+    }
+
     /** 이미지 URL에서 다운로드하거나 Base64 문자열을 디코딩합니다. */
     private fun downloadOrDecodeImage(imageUrl: String): ByteArray {
         return when {